@@ -0,0 +1,319 @@
+"""
+Offline benchmark for the WinstonCog transcription pipeline.
+
+Drives the real cog (pipeline, STT pool, caches, job store) with fake Discord interactions,
+a synthetic media source that generates audio of a configurable length instead of calling yt-dlp,
+and a stub whisper-server with configurable latency. Needs ffmpeg on PATH.
+
+	python benchmark.py --jobs 20 --media-seconds 120 --stt-latency 0.2 --stt-rtf 0.05
+
+Reports jobs/minute, p50/p95 end-to-end latency and peak RSS so hot-path changes can be compared run to run.
+"""
+import argparse, asyncio, os, sys, time, tempfile, resource, statistics, stat
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Writes a 44.1 kHz mono WAV of noise bursts separated by short silences to argv[2] ("-" for stdout)
+SYNTHETIC_AUDIO = r"""
+import os, sys, struct
+seconds, target = float(sys.argv[1]), sys.argv[2]
+rate = 44100
+total = int(seconds * rate) * 2
+out = sys.stdout.buffer if target == "-" else open(target, "wb")
+out.write(struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + total, b"WAVE", b"fmt ", 16, 1, 1, rate, rate * 2, 2, 16, b"data", total))
+quiet = bytes(b & 0x1F for b in range(256))  # keeps samples to roughly a quarter of full scale
+burst, gap = rate * 2 * 4, rate * 2 // 2
+written = 0
+while written < total:
+	chunk = min(burst, total - written)
+	out.write(os.urandom(chunk).translate(quiet))
+	written += chunk
+	chunk = min(gap, total - written)
+	out.write(bytes(chunk))
+	written += chunk
+out.flush()
+"""
+
+
+# ---------------------------------------------------------------- stub whisper-server
+
+def run_stub_server(argv: list[str]):
+	"""Stand-in for whisper-server: same CLI, /health and multipart /inference."""
+	from aiohttp import web
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--port", type=int, required=True)
+	parser.add_argument("--latency", type=float, default=0.1)
+	parser.add_argument("--rtf", type=float, default=0.05)
+	parser.add_argument("--load-seconds", type=float, default=0.5)
+	args, _ = parser.parse_known_args(argv)
+
+	loaded_at = time.monotonic() + args.load_seconds
+	lock = asyncio.Lock()  # whisper-server handles one inference at a time
+
+	async def health(request):
+		if time.monotonic() < loaded_at:
+			return web.json_response({"status": "loading model"}, status=503)
+		return web.json_response({"status": "ok"})
+
+	async def inference(request):
+		form = await request.post()
+		size = len(form["file"].file.read())
+		duration = max(0, size - 44) / (16000 * 2)
+		async with lock:
+			await asyncio.sleep(args.latency + args.rtf * duration)
+		return web.json_response({"text": f"synthetic transcript of {duration:.1f}s"})
+
+	app = web.Application(client_max_size=1024 ** 3)
+	app.router.add_get("/health", health)
+	app.router.add_post("/inference", inference)
+	web.run_app(app, host="127.0.0.1", port=args.port, print=None)
+
+
+# ---------------------------------------------------------------- fake Discord objects
+
+class FakeUser:
+	def __init__(self, user_id: int):
+		self.id = user_id
+		self.mention = f"<@{user_id}>"
+
+
+class FakeMessage:
+	def __init__(self, channel: "FakeChannel"):
+		self.channel = channel
+
+	async def edit(self, **kwargs):
+		self.channel.edits.append((time.perf_counter(), kwargs))
+
+
+class FakeChannel:
+	def __init__(self, channel_id: int):
+		self.id = channel_id
+		self.messages: list[tuple[float, dict]] = []
+		self.edits: list[tuple[float, dict]] = []
+
+	async def send(self, content=None, **kwargs):
+		self.messages.append((time.perf_counter(), {"content": content, **kwargs}))
+		return FakeMessage(self)
+
+
+class FakeResponse:
+	def __init__(self, channel: FakeChannel):
+		self.channel = channel
+
+	async def send_message(self, content=None, **kwargs):
+		await self.channel.send(content, **kwargs)
+
+
+class FakeInteraction:
+	def __init__(self, user_id: int, channel: FakeChannel):
+		self.id = user_id
+		self.user = FakeUser(user_id)
+		self.channel = channel
+		self.response = FakeResponse(channel)
+
+	async def original_response(self):
+		return FakeMessage(self.channel)
+
+
+class FakeBot:
+	user = None
+
+	def __init__(self):
+		self.cogs = {}
+
+	def get_cog(self, name):
+		return self.cogs.get(name)
+
+	def get_channel(self, channel_id):
+		return None
+
+	async def fetch_channel(self, channel_id):
+		raise LookupError(channel_id)
+
+	async def wait_until_ready(self):
+		return
+
+
+# ---------------------------------------------------------------- benchmark driver
+
+def make_synthetic_source(base, job_cls):
+	class SyntheticSource(base):
+		"""Media source whose 'download' generates synthetic audio, url: synthetic://<id>?seconds=<n>"""
+		id = "synthetic"
+		in_process = False  # no yt-dlp involved, always run the commands
+
+		def can_handle(self, url: str) -> bool:
+			return url.startswith("synthetic://")
+
+		def _seconds(self, job) -> str:
+			return job.canonical_url.split("seconds=", 1)[1]
+
+		def create_job(self, interaction, url: str):
+			media_id = url[len("synthetic://"):].split("?", 1)[0]
+			return job_cls(interaction=interaction, source=self, media_id=media_id, canonical_url=url)
+
+		def build_ytdlp_cmd(self, job, audio_path: str) -> list[str]:
+			return [sys.executable, "-c", SYNTHETIC_AUDIO, self._seconds(job), audio_path]
+
+		def build_ytdlp_stream_cmd(self, job) -> list[str]:
+			return [sys.executable, "-c", SYNTHETIC_AUDIO, self._seconds(job), "-"]
+
+		def build_ytdlp_probe_cmd(self, job) -> list[str]:
+			info = f'{{"title": "{job.media_id}", "duration": {self._seconds(job)}, "formats": []}}'
+			return [sys.executable, "-c", f"print('{info}')"]
+
+	return SyntheticSource()
+
+
+def write_stub_launcher(directory: str, args) -> None:
+	"""WHISPER_BACKEND/whisper-server that runs this file in stub server mode."""
+	path = os.path.join(directory, "whisper-server")
+	with open(path, "w") as f:
+		f.write("#!/bin/sh\n")
+		f.write(
+			f'exec "{sys.executable}" "{os.path.abspath(__file__)}" --stub-server '
+			f'--latency {args.stt_latency} --rtf {args.stt_rtf} --load-seconds {args.stt_load_seconds} "$@"\n'
+		)
+	os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def percentile(values: list[float], p: float) -> float:
+	ordered = sorted(values)
+	return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def run_benchmark(args):
+	sys.path.insert(0, REPO_DIR)
+	os.environ.setdefault("OWNER_IDS", "0")
+	from cogs.Winston import WinstonCog, MediaSourceStrategy, TranscriptionJob
+	from utils.Metrics import Metrics
+
+	workdir = tempfile.mkdtemp(prefix="winston-bench-")
+	write_stub_launcher(workdir, args)
+	os.environ["WHISPER_BACKEND"] = workdir
+	os.chdir(workdir)  # keep caches, job store, logs and downloads out of the repo
+
+	bot = FakeBot()
+	cog = WinstonCog(bot, mode="bot" if args.workers else "local")
+	bot.cogs["WinstonCog"] = cog
+	# With --workers the cog only queues and delivers, in-process worker cogs run the jobs through the broker
+	workers = [WinstonCog(FakeBot(), mode="worker", worker_slot=n) for n in range(args.workers)]
+	for instance in [cog, *workers]:
+		instance.sources.append(make_synthetic_source(MediaSourceStrategy, TranscriptionJob))
+		instance._stream_audio = not args.file_mode
+		for pool in instance.stt_pools.values():
+			pool.max_instances = args.instances
+
+	started = time.perf_counter()
+	if args.batch:
+		await run_batch(cog, args, started)
+		await asyncio.gather(*(worker.cog_unload() for worker in workers))
+		return
+
+	channels = [FakeChannel(1000 + i) for i in range(args.jobs)]
+	submitted: dict[int, float] = {}
+
+	for i, channel in enumerate(channels):
+		interaction = FakeInteraction(i, channel)
+		submitted[channel.id] = time.perf_counter()
+		await cog.transcribe.callback(cog, interaction, f"synthetic://bench{i}-{int(started)}?seconds={args.media_seconds}")
+		if args.interval:
+			await asyncio.sleep(args.interval)
+
+	def finished(channel: FakeChannel) -> bool:
+		# First message is the "Transcribing..." acknowledgement
+		return len(channel.messages) >= 2
+
+	deadline = started + args.timeout
+	while not all(finished(c) for c in channels) and time.perf_counter() < deadline:
+		await asyncio.sleep(0.05)
+	elapsed = time.perf_counter() - started
+
+	latencies, failures = [], 0
+	for channel in channels:
+		if not finished(channel):
+			continue
+		done_at, message = channel.messages[1]
+		embed = message.get("embed")
+		if embed is not None and embed.title.startswith("❌"):
+			failures += 1
+		else:
+			latencies.append(done_at - submitted[channel.id])
+
+	stage_summary = cog.metrics.snapshot()["stages"]
+	# Workers' timings are pooled, stages the bot also records (eg. queue_wait) are listed separately
+	worker_metrics = Metrics()
+	for worker in workers:
+		for name, timings in worker.metrics.stages.items():
+			for seconds in timings.samples:
+				worker_metrics.observe(name, seconds)
+	for name, summary in worker_metrics.snapshot()["stages"].items():
+		stage_summary[f"worker.{name}" if name in stage_summary else name] = summary
+	await cog.cog_unload()
+	await asyncio.gather(*(worker.cog_unload() for worker in workers))
+
+	self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+	child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+	print()
+	print(f"jobs: {args.jobs} × {args.media_seconds}s media, {args.instances} STT instance(s), {'file' if args.file_mode else 'streaming'} mode"
+		+ (f", {args.workers} worker(s)" if args.workers else ""))
+	print(f"completed: {len(latencies)}  failed: {failures}  timed out: {args.jobs - len(latencies) - failures}")
+	if latencies:
+		print(f"throughput: {len(latencies) / elapsed * 60:.1f} jobs/min")
+		print(f"latency: p50 {percentile(latencies, 50):.2f}s  p95 {percentile(latencies, 95):.2f}s  mean {statistics.mean(latencies):.2f}s")
+	print(f"peak RSS: bot {self_rss:.1f} MiB, largest child {child_rss:.1f} MiB")
+	print("stages (p50 / p95):")
+	for name, summary in stage_summary.items():
+		print(f"  {name:<18} {summary['p50']:.3f}s / {summary['p95']:.3f}s  (n={summary['count']})")
+
+
+async def run_batch(cog, args, started: float):
+	"""Submit every job as one /transcribe_batch request and time until the zip is sent."""
+	channel = FakeChannel(1000)
+	links = " ".join(f"synthetic://bench{i}-{int(started)}?seconds={args.media_seconds}" for i in range(args.jobs))
+	await cog.transcribe_batch.callback(cog, FakeInteraction(0, channel), links)
+
+	def delivered():
+		return next((message for _, message in channel.messages if message.get("file") is not None), None)
+
+	deadline = started + args.timeout
+	while delivered() is None and time.perf_counter() < deadline:
+		await asyncio.sleep(0.05)
+	elapsed = time.perf_counter() - started
+	message = delivered()
+	await cog.cog_unload()
+
+	print()
+	print(f"batch: {args.jobs} × {args.media_seconds}s media, {args.instances} STT instance(s), {'file' if args.file_mode else 'streaming'} mode")
+	if message is None:
+		print("timed out")
+		return
+	print(f"zip delivered in {elapsed:.2f}s ({args.jobs / elapsed * 60:.1f} items/min)")
+	print(f"messages sent: {len(channel.messages)}, progress edits: {len(channel.edits)}")
+
+
+def main():
+	if "--stub-server" in sys.argv:
+		run_stub_server([a for a in sys.argv[1:] if a != "--stub-server"])
+		return
+
+	parser = argparse.ArgumentParser(description="Offline WinstonCog pipeline benchmark")
+	parser.add_argument("--jobs", type=int, default=10)
+	parser.add_argument("--media-seconds", type=float, default=60)
+	parser.add_argument("--interval", type=float, default=0, help="seconds between submissions")
+	parser.add_argument("--instances", type=int, default=2, help="max stub whisper-server instances")
+	parser.add_argument("--stt-latency", type=float, default=0.1, help="fixed seconds per inference request")
+	parser.add_argument("--stt-rtf", type=float, default=0.05, help="inference seconds per second of audio")
+	parser.add_argument("--stt-load-seconds", type=float, default=0.5, help="simulated model load time")
+	parser.add_argument("--file-mode", action="store_true", help="use the downloads/ file path instead of streaming")
+	parser.add_argument("--batch", action="store_true", help="submit all jobs as one /transcribe_batch request")
+	parser.add_argument("--workers", type=int, default=0, help="run split: bot-mode cog plus this many worker-mode cogs")
+	parser.add_argument("--timeout", type=float, default=600)
+	args = parser.parse_args()
+	asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+	main()
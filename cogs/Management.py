@@ -19,6 +19,52 @@ class ManagementCog(CogModule):
 		print("Commands synced!")
 		await interaction.response.send_message(f"Synced {len(synced_commands)} commands:\n" + "\n".join(f"- {cmd.name}" for cmd in synced_commands), ephemeral=True)
 
+	@discord.app_commands.command(name="stats", description="View transcription pipeline latency and counters")
+	async def stats(self, interaction: discord.Interaction):
+		"""Slash command to show per-stage timings from the Winston cog."""
+		if not self.is_owner(interaction):
+			await self.send_unauthorised_message(interaction)
+			return
+
+		winston = self.bot.get_cog("WinstonCog")
+		if winston is None:
+			await interaction.response.send_message("Winston cog is not loaded.", ephemeral=True)
+			return
+
+		snapshot = winston.metrics.snapshot()
+
+		def fmt(seconds):
+			return "-" if seconds is None else f"{seconds:.2f}s"
+
+		stage_lines = [
+			f"**{name}** • p50 {fmt(s['p50'])} • p95 {fmt(s['p95'])} • max {fmt(s['max'])} • n={s['count']}"
+			for name, s in snapshot["stages"].items()
+		]
+		counter_lines = [f"**{name}**: {value}" for name, value in sorted(snapshot["counters"].items())]
+
+		def add_lines(e, name, lines, empty, max_fields=3):
+			# A field holds 1024 characters and an embed 6000, so long lists carry on in a few more fields and the rest are counted
+			values = [""]
+			for n, line in enumerate(lines):
+				if values[-1] and len(values[-1]) + len(line) > 1000:
+					if len(values) == max_fields:
+						values[-1] += f"…and {len(lines) - n} more"
+						break
+					values.append("")
+				values[-1] += line + "\n"
+			for i, value in enumerate(values):
+				e.add_field(name=name if i == 0 else f"{name} (cont.)", value=value or empty, inline=False)
+
+		embed = winston.build_embed(
+			"📈 Pipeline Stats",
+			discord.Color.teal(),
+			lambda e: [
+				add_lines(e, "Stage Latency", stage_lines, "No jobs yet.", max_fields=2),
+				add_lines(e, "Counters", counter_lines, "No events yet.")
+			]
+		)
+		await interaction.response.send_message(embed=embed, ephemeral=True)
+
 	@discord.app_commands.command(name="shutdown", description="Gracefully shut down emma-kyu")
 	async def shutdown(self, interaction: discord.Interaction):
 		"""Slash command to shut down the bot."""
@@ -1,17 +1,42 @@
-import re, json, discord, asyncio, os, base64, time
+import re, io, json, discord, asyncio, os, time, mmap, aiohttp, itertools, collections, contextlib, zipfile, socket, sqlite3
 from abc import ABC, abstractmethod
 from utils.CogModule import CogModule
 from discord.ext import commands, tasks
 from urllib.parse import urlparse, parse_qs
-
-from utils.STT import STTClient
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+from utils.STTPool import STTPool, NoHealthyServer
+from utils.TranscriptCache import TranscriptCache
+from utils.Pipeline import Pipeline, Stage
+from utils.JobStore import JobStore
+from utils.Metrics import Metrics
+from utils.ProgressMessage import ProgressMessage
+from utils.ArtifactStore import ArtifactStore
+from utils.Scheduler import FairScheduler
+from utils.TTLCache import TTLCache
+from utils.ThroughputModel import ThroughputModel
+from utils.MediaFetcher import MediaFetcher, FetchError, FetcherCrashed
+from utils.Broker import JobBroker, BrokerMessage
+from utils.KeepAlive import KeepAlivePolicy
+from utils import Audio
 import utils.utils as utils
 
+QualityTier = Literal["accurate", "balanced", "fast"]
+
 YOUTUBE_REGEX = re.compile(r"^(https?:\/\/)?(www\.)?(youtube\.com|youtu\.be)\/.+$")
+UNSAFE_FILENAME_REGEX = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+FFMPEG_BENCH_REGEX = re.compile(r"bench: utime=(?P<utime>[\d.]+)s stime=(?P<stime>[\d.]+)s")
 
 
 class MediaSourceStrategy(ABC):
 	id: str
+	in_process = True  # fetch through the pooled MediaFetcher when yt_dlp is installed, otherwise run the commands below
+
+	# Whisper only needs 16 kHz mono, so fetch the smallest audio-only format that is still clean speech
+	min_audio_bitrate = 32              # kbps
+	preferred_codecs = ("opus",)        # wins ties on bitrate
+	fallback_format = "wa[abr>=32]/ba/b"  # when the probe didn't list formats
 
 	@abstractmethod
 	def can_handle(self, url: str) -> bool:
@@ -21,25 +46,294 @@ class MediaSourceStrategy(ABC):
 	def create_job(self, interaction: discord.Interaction, url: str) -> "TranscriptionJob | None":
 		...
 
-	@abstractmethod
+
+	def is_playlist(self, url: str) -> bool:
+		"""Whether the link is a collection of media that should be expanded into its items."""
+		return False
+
+	def time_range(self, url: str) -> tuple[float | None, float | None]:
+		"""(start, end) seconds the link points at, eg. YouTube's t=, or (None, None)."""
+		return None, None
+
+	def section_args(self, job: "TranscriptionJob") -> list[str]:
+		"""yt-dlp flags to only download the job's window."""
+		if not job.clipped:
+			return []
+		return ["--download-sections", f"*{job.clip_start or 0:g}-{'inf' if job.clip_end is None else f'{job.clip_end:g}'}"]
+
 	def build_ytdlp_cmd(self, job: "TranscriptionJob", audio_path: str) -> list[str]:
-		...
+		"""Command that downloads the job's audio to audio_path."""
+		return [
+			*utils.ytdlp_command(),
+			"-f", self.format_selector(job),
+			*self.section_args(job),
+			"-o", audio_path,
+			job.canonical_url,
+		]
+
+	def build_ytdlp_stream_cmd(self, job: "TranscriptionJob") -> list[str]:
+		"""Command that writes the job's audio to stdout."""
+		return [
+			*utils.ytdlp_command(),
+			"-f", self.format_selector(job),
+			*self.section_args(job),
+			"--quiet",
+			"-o", "-",
+			job.canonical_url,
+		]
+
+	def build_ytdlp_probe_cmd(self, job: "TranscriptionJob") -> list[str]:
+		"""Command that prints yt-dlp's info JSON for the media without downloading it."""
+		return [
+			*utils.ytdlp_command(),
+			"-J",
+			"--no-playlist",
+			"--no-warnings",
+			job.canonical_url,
+		]
+
+	def build_ytdlp_playlist_cmd(self, url: str) -> list[str]:
+		"""Command that prints the playlist's entries as JSON without resolving each one."""
+		return [*utils.ytdlp_command(), "-J", "--flat-playlist", "--yes-playlist", "--no-warnings", url]
+
+	async def submit_playlist(self, fetcher: MediaFetcher, url: str) -> dict:
+		"""build_ytdlp_playlist_cmd on the fetcher's worker pool."""
+		return await fetcher.probe(url, {"extract_flat": "in_playlist", "noplaylist": False})
+
+	def playlist_urls(self, info: dict) -> list[str]:
+		return [url for entry in info.get("entries") or [] if (url := entry.get("url") or entry.get("webpage_url"))]
+
+	def select_audio_format(self, job: "TranscriptionJob") -> dict | None:
+		"""The probed audio-only format to fetch: of the original language's tracks, lowest bitrate at or above min_audio_bitrate."""
+		formats = job.metadata.audio_formats if job.metadata else []
+		# Multi-audio media (eg. dubbed YouTube videos) rank the original track highest, dubs would transcribe the wrong language
+		if formats:
+			original = max(self._language_preference(f) for f in formats)
+			formats = [f for f in formats if self._language_preference(f) == original]
+		formats = [f for f in formats if (f["abr"] or 0) >= self.min_audio_bitrate]
+		if not formats:
+			return None
+		return min(formats, key=lambda f: (f["abr"], (f["acodec"] or "").split(".")[0] not in self.preferred_codecs))
+
+	@staticmethod
+	def _language_preference(fmt: dict) -> int:
+		"""yt-dlp's rank of a format's audio track, a missing rank counts as -1 like yt-dlp's sorter does."""
+		preference = fmt.get("language_preference")  # metadata cached before it was probed has none
+		return -1 if preference is None else preference
+
+	def format_selector(self, job: "TranscriptionJob") -> str:
+		"""yt-dlp -f value for the job, falling back to a generic selector if the chosen format fails."""
+		chosen = self.select_audio_format(job)
+		return f"{chosen['format_id']}/{self.fallback_format}" if chosen else self.fallback_format
+
+	def ytdlp_options(self, job: "TranscriptionJob", action: str) -> dict:
+		"""yt-dlp API options for a MediaFetcher action, the equivalent of the build_ytdlp_*_cmd flags."""
+		if action == "probe":
+			return {}
+		options = {"format": self.format_selector(job)}
+		if action == "download" and job.clipped:
+			options["section"] = [job.clip_start or 0, job.clip_end]
+		return options
+
+	async def submit(self, fetcher: MediaFetcher, job: "TranscriptionJob", action: str, output_path: str | None = None):
+		"""Run a probe/resolve/download for the job on the fetcher's worker pool."""
+		options = self.ytdlp_options(job, action)
+		if action == "download":
+			return await fetcher.download(job.canonical_url, options, output_path)
+		return await getattr(fetcher, action)(job.canonical_url, options)
+
+	def parse_metadata(self, info: dict) -> "MediaMetadata":
+		audio_formats = [
+			{
+				"format_id": f.get("format_id"),
+				"ext": f.get("ext"),
+				"acodec": f.get("acodec"),
+				"abr": f.get("abr"),
+				"filesize": f.get("filesize") or f.get("filesize_approx"),
+				"language_preference": f.get("language_preference"),
+			}
+			for f in info.get("formats") or []
+			if f.get("acodec") not in (None, "none") and f.get("vcodec") in (None, "none")
+		]
+		return MediaMetadata(
+			title=info.get("title"),
+			duration=info.get("duration"),
+			thumbnail_url=info.get("thumbnail"),
+			audio_formats=audio_formats,
+		)
+
+
+class MediaMetadata:
+	"""What a probe learned about a piece of media before downloading it."""
+	def __init__(
+		self,
+		available: bool = True,
+		title: str | None = None,
+		duration: float | None = None,
+		thumbnail_url: str | None = None,
+		audio_formats: list[dict] | None = None,
+		error: str | None = None,
+	):
+		self.available = available
+		self.title = title
+		self.duration = duration
+		self.thumbnail_url = thumbnail_url
+		self.audio_formats = audio_formats or []
+		self.error = error
+
+
+class PipelineError(Exception):
+	"""A job stage failed; title/message are user facing, detail goes to the console."""
+	def __init__(self, title: str, message: str, detail: str = ""):
+		super().__init__(message)
+		self.title = title
+		self.message = message
+		self.detail = detail
 
 
 class TranscriptionJob:
 	def __init__(
 		self,
-		interaction: discord.Interaction,
+		interaction: discord.Interaction | None,
 		source: "MediaSourceStrategy",
 		media_id: str,
 		canonical_url: str,
 		thumbnail_url: str | None = None,
+		channel: "discord.abc.Messageable | None" = None,
+		user_id: int | None = None,
 	):
+		# Jobs restored from the JobStore have no interaction, only the channel and user
 		self.interaction = interaction
+		self.channel = channel if channel is not None else interaction.channel
+		self.user_id = user_id if user_id is not None else interaction.user.id
 		self.source = source
 		self.media_id = media_id
 		self.canonical_url = canonical_url
 		self.thumbnail_url = thumbnail_url
+		self.id: int | None = None  # JobStore row id
+		self.task_id: int | None = None  # broker task, when the bot and workers run split
+
+		# Only transcribe this window of the media (seconds), from /transcribe options or a t= link
+		self.clip_start: float | None = None
+		self.clip_end: float | None = None
+
+		# STT quality tier the user asked for (None lets the policy choose) and the one picked for the job
+		self.quality: str | None = None
+		self.stt_tier: str | None = None
+
+		# Filled in as the job moves through the pipeline
+		self.enqueued_at: float = time.perf_counter()
+		self.marks: dict[str, float] = {}  # one-off timestamps, eg. first partial transcript
+		self.start_time: float | None = None
+		self.audio_path: str | None = None
+		self.pcm_path: str | None = None  # pinned in the ArtifactStore while set
+		self.pcm: bytes | mmap.mmap | None = None
+		self.transcript: str | None = None
+		self.duration: float | None = None  # seconds of media, when known
+		self.metadata: MediaMetadata | None = None
+		self.starts_at: float | None = None  # unix time the job is expected to reach STT
+		self.eta: float | None = None  # unix time the job is expected to finish
+
+		# Message edited with the transcript so far, only for jobs started from an interaction
+		self.progress: ProgressMessage | None = None
+
+		# Later requests for the same media that are waiting on this job
+		self.followers: list["TranscriptionJob"] = []
+
+		# Set for items of a /transcribe_batch request, which report through the batch instead
+		self.batch: "TranscriptionBatch | None" = None
+		self.batch_index = 0
+
+	@property
+	def clipped(self) -> bool:
+		return self.clip_start is not None or self.clip_end is not None
+
+	@property
+	def clip_id(self) -> str:
+		"""media_id, plus the window for clipped jobs, so artifacts and transcripts are stored per window."""
+		if not self.clipped:
+			return self.media_id
+		return f"{self.media_id}_{self.clip_start or 0:g}-{'end' if self.clip_end is None else f'{self.clip_end:g}'}"
+
+	@property
+	def key(self) -> tuple[str, str]:
+		return (self.source.id, self.clip_id)
+
+	@property
+	def inflight_key(self) -> tuple[str, str, str | None]:
+		"""In-flight jobs are per requested quality, so a request for a better tier doesn't wait on a worse one."""
+		return (*self.key, self.quality)
+
+	@property
+	def media_key(self) -> tuple[str, str]:
+		"""Identifies the media itself regardless of window, eg. for metadata."""
+		return (self.source.id, self.media_id)
+
+	def clip_duration(self, media_duration: float | None) -> float | None:
+		"""Seconds of media this job covers, given the full media's duration."""
+		start = self.clip_start or 0
+		end = self.clip_end if media_duration is None else min(self.clip_end or media_duration, media_duration)
+		return None if end is None else max(0.0, end - start)
+
+	@property
+	def mention(self) -> str:
+		return f"<@{self.user_id}>"
+
+	def to_record(self) -> dict:
+		return {
+			"source_id": self.source.id,
+			"media_id": self.media_id,
+			"canonical_url": self.canonical_url,
+			"thumbnail_url": self.thumbnail_url,
+			"channel_id": self.channel.id,
+			"user_id": self.user_id,
+			"clip_start": self.clip_start,
+			"clip_end": self.clip_end,
+			"quality": self.quality,
+		}
+
+	def channel_mentions(self) -> list[tuple["discord.abc.Messageable", str]]:
+		"""Group this job and its followers by channel, with the users to mention in each."""
+		grouped: dict[int, tuple] = {}
+		for job in [self, *self.followers]:
+			if job.batch is not None:
+				continue  # reported in the batch's own message
+			_, mentions = grouped.setdefault(job.channel.id, (job.channel, {}))
+			mentions[job.mention] = None
+		return [(channel, " ".join(mentions)) for channel, mentions in grouped.values()]
+
+
+class TranscriptionBatch:
+	"""Jobs requested together with /transcribe_batch, reported through one progress message and one zip."""
+	def __init__(self, interaction: discord.Interaction):
+		self.interaction = interaction
+		self.id = interaction.id
+		self.channel = interaction.channel
+		self.user_id = interaction.user.id
+		self.started: float = time.perf_counter()
+		self.items: list[TranscriptionJob] = []
+		self.skipped: list[str] = []  # links that aren't supported or couldn't be expanded
+		self.results: dict[int, str] = {}  # item index → transcript
+		self.errors: dict[int, str] = {}   # item index → user facing error
+		self.progress: ProgressMessage | None = None
+		self.delivered = False
+
+	def add(self, job: TranscriptionJob):
+		job.batch = self
+		job.batch_index = len(self.items)
+		self.items.append(job)
+
+	@property
+	def finished(self) -> int:
+		return len(self.results) + len(self.errors)
+
+	@property
+	def done(self) -> bool:
+		return self.finished == len(self.items)
+
+	@property
+	def mention(self) -> str:
+		return f"<@{self.user_id}>"
 
 
 class YouTubeSource(MediaSourceStrategy):
@@ -48,6 +342,19 @@ class YouTubeSource(MediaSourceStrategy):
 	def can_handle(self, url: str) -> bool:
 		return bool(YOUTUBE_REGEX.match(url))
 
+	def is_playlist(self, url: str) -> bool:
+		parsed = urlparse(url)
+		return parsed.path.rstrip("/") == "/playlist" and "list" in parse_qs(parsed.query)
+
+	def time_range(self, url: str) -> tuple[float | None, float | None]:
+		query = parse_qs(urlparse(url).query)
+		start = query.get("t") or query.get("start")
+		end = query.get("end")
+		return (
+			utils.parse_timestamp(start[0]) if start else None,
+			utils.parse_timestamp(end[0]) if end else None,
+		)
+
 	def _extract_video_id(self, url: str) -> str | None:
 		parsed = urlparse(url)
 		if parsed.netloc.endswith("youtu.be"):
@@ -77,20 +384,10 @@ class YouTubeSource(MediaSourceStrategy):
 			thumbnail_url=thumb,
 		)
 
-	def build_ytdlp_cmd(self, job: TranscriptionJob, audio_path: str) -> list[str]:
-		ytdlp_path = os.path.join(os.getcwd(), "yt-dlp.exe")
-		return [
-			ytdlp_path,
-			"-f", "bestaudio",
-			"--extract-audio",
-			"--audio-format", "mp3",
-			"-o", audio_path,
-			job.canonical_url,
-		]
-
 
 class RedditSource(MediaSourceStrategy):
 	id = "reddit"
+	preferred_codecs = ("mp4a",)  # Reddit's DASH audio is AAC only
 
 	def can_handle(self, url: str) -> bool:
 		parsed = urlparse(url)
@@ -119,7 +416,7 @@ class RedditSource(MediaSourceStrategy):
 	def create_job(self, interaction: discord.Interaction, url: str) -> TranscriptionJob | None:
 		media_id = self._extract_media_id(url)
 		canonical_url = url  # keep as provided; yt-dlp can handle it directly
-		thumbnail_url = None  # could be enhanced later via metadata probe
+		thumbnail_url = None  # filled in by the metadata probe
 		return TranscriptionJob(
 			interaction=interaction,
 			source=self,
@@ -128,21 +425,10 @@ class RedditSource(MediaSourceStrategy):
 			thumbnail_url=thumbnail_url,
 		)
 
-	def build_ytdlp_cmd(self, job: TranscriptionJob, audio_path: str) -> list[str]:
-		ytdlp_path = os.path.join(os.getcwd(), "yt-dlp.exe")
-		return [
-			ytdlp_path,
-			"-f", "bestaudio",
-			"--extract-audio",
-			"--audio-format", "mp3",
-			"-o", audio_path,
-			job.canonical_url,
-		]
-
 
 class WinstonCog(CogModule):
 	"""Main winston orchestrator"""
-	def __init__(self, bot: commands.Bot):
+	def __init__(self, bot: commands.Bot, mode: Literal["local", "bot", "worker"] = "local", worker_slot: int = 0, worker_capacity: int = 4):
 		super().__init__(bot)
 		self.bot = bot
 
@@ -152,18 +438,38 @@ class WinstonCog(CogModule):
 			RedditSource(),
 		]
 
+		# Deployment: "local" runs every stage here. "bot" only probes and delivers, the download/convert/transcribe
+		# work is queued in the broker for worker processes (worker.py), which lease it and report back
+		self.mode = mode
+		self.broker = JobBroker(os.getenv("WINSTON_BROKER", "./data/broker.sqlite3")) if mode != "local" else None
+		self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{worker_slot}"
+		# Workers on one host each get their own downloads/, keep-alive history and metrics file (numbered by
+		# slot, stable across restarts). Those stores are single-process, sharing them would drop each other's
+		# pins and overwrite each other's index. The broker is the only state workers share.
+		self._state_suffix = f"-worker-{worker_slot}" if mode == "worker" else ""
+		self._remote_concurrency = 16  # jobs handed to the broker at once, the rest wait in the fair scheduler
+		self._remote_jobs: dict[int, tuple[TranscriptionJob, asyncio.Future]] = {}  # bot: broker task id → job awaiting its result
+		self._worker_capacity = worker_capacity  # jobs a worker holds leases for at once
+		self.leased_jobs: dict[int, TranscriptionJob] = {}  # worker: broker task id → job
+
 		# Job management
-		self.queue = asyncio.Queue()
-		self.pending_jobs: list[TranscriptionJob] = []
-		self.active_jobs: list[TranscriptionJob] = []
-
-		# STT client lifecycle (lazy startup + warmup + idle shutdown)
-		self.stt: STTClient | None = None
-		self._stt_lock = asyncio.Lock()
-		self._stt_last_used: float | None = None
-		self._stt_busy: bool = False
+		# Pending jobs wait in a per-user fair scheduler, optionally shortest media first
+		self.scheduler = FairScheduler(
+			user_of=lambda job: job.user_id,
+			cost_of=lambda job: job.duration,
+			shortest_first=True
+		)
+		self.active_jobs: dict[int, TranscriptionJob] = {}  # JobStore id → job
+		self._inflight: dict[tuple[str, str, str | None], TranscriptionJob] = {}  # (source.id, media_id, quality) → leader job
+
+		# Durable record of unfinished jobs, resumed on startup from their last completed stage
+		self.job_store = JobStore(":memory:" if mode == "worker" else "./data/jobs.sqlite3")  # the bot owns a worker's jobs
+		self._resume_task: asyncio.Task | None = None
+
+		# STT pool lifecycle (lazy startup + readiness probing + per-instance idle shutdown)
 		self._stt_idle_timeout = 5 * 60      # 5 minutes
-		self._stt_warmup_seconds = 5         # backend warm-up
+		self._stt_ready_timeout = 2 * 60     # give up on a server that hasn't loaded its model by then
+		self._stt_jobs_per_instance = 2      # queue depth handled by each instance
 
 		# Static STT configuration
 		self._stt_host = "127.0.0.1"
@@ -178,63 +484,504 @@ class WinstonCog(CogModule):
 		}
 		self._stt_log_dir = "./logs/subprocesses"
 
+		# Quality tiers, best first. Each runs its own pool of whisper-servers,
+		# tiers whose model file isn't installed are skipped (the default tier always runs)
+		self._stt_tiers = {
+			"accurate": {"model": "./models/whisper-large-v3-turbo-Q8_0.bin", "beam_size": 8, "max_instances": 2},
+			"balanced": {"model": "./models/whisper-large-v3-turbo-q5_0.bin", "beam_size": 4, "max_instances": 1},
+			"fast":     {"model": "./models/whisper-base-q8_0.bin",           "beam_size": 1, "max_instances": 2},
+		}
+		self._stt_default_tier = "accurate"
+		# (tier, longest media, longest backlog) in seconds, the first rule a job fits wins
+		self._stt_tier_rules = [
+			("accurate", 20 * 60, 10 * 60),
+			("balanced", 90 * 60, 30 * 60),
+			("fast", float("inf"), float("inf")),
+		]
+		# The bot of a split deployment runs no STT, its workers pick tiers from the models they have
+		self.stt_pools = {} if mode == "bot" else {
+			name: STTPool(
+				self._stt_host,
+				self._stt_endpoint,
+				self._tier_config(name),
+				self._stt_log_dir,
+				max_instances=tier["max_instances"],
+				jobs_per_instance=self._stt_jobs_per_instance,
+				ready_timeout=self._stt_ready_timeout
+			)
+			for name, tier in self._stt_tiers.items()
+			if name == self._stt_default_tier or os.path.exists(tier["model"])
+		}
+		self._prewarm_tasks: set[asyncio.Task] = set()
+
+		# Keep-alive learned from request arrivals (bursts and hour of day) instead of the fixed idle timeout,
+		# which stays as the baseline that cold starts and memory saved are reported against
+		self._stt_adaptive_keep_alive = True
+		self.keep_alive = KeepAlivePolicy(f"./data/stt_arrivals{self._state_suffix}.json", default_idle=self._stt_idle_timeout)
+		self._stt_early_shutdowns: list[tuple[str, float, float, int]] = []  # (tier, shut down at, fixed timeout's deadline, bytes)
+		self._arrivals_seen = self.keep_alive.last_arrival or time.time()  # workers learn arrivals from the broker
+
+		# Pipe yt-dlp → ffmpeg → memory instead of round-tripping through downloads/
+		self._stream_audio = True
+		# Stream PCM into downloads/ and memory-map it back, so a restart or repeat can skip the download
+		# and memory doesn't grow with the media's length (off, it's kept in memory)
+		self._checkpoint_audio = True
+
+		# Downloaded and converted audio, reused across retries and evicted LRU over the disk budget
+		self.artifacts = ArtifactStore(f"./downloads{self._state_suffix}", max_bytes=10 * 1024 ** 3)  # 10 GiB, per worker
+
+		# Long media is split at silences and transcribed in parallel
+		self._stt_segment_seconds = 120
+		self._stt_parallelism = 4
+		self._stt_segment_retries = 2
+		self._stt_first_segment_seconds = 30  # short first segment for a fast first partial transcript
+		self._vad_prepass = True  # strip silence in-process so it's never uploaded or decoded
+
+		# Partial transcripts are edited into the original response at most this often (Discord rate limits)
+		self._progress_interval = 2.0
+
+		# Transcript cache (LRU by size, expired by age)
+		self.transcript_cache = TranscriptCache(
+			"./transcripts/cache",
+			max_bytes=256 * 1024 * 1024,  # 256 MiB
+			max_age=30 * 24 * 60 * 60     # 30 days
+		)
+
+		# Staged job pipeline, each stage has its own workers and a bounded queue in front of it
+		self._pipeline_concurrency = {"download": 2, "convert": 2, "transcribe": 2, "deliver": 2}
+		self._pipeline_queue_size = 2
+		if mode == "bot":
+			stages = [Stage("remote", self._stage_remote, self._remote_concurrency, queue=self.scheduler)]
+		else:
+			stages = [
+				Stage("download", self._stage_download, self._pipeline_concurrency["download"], queue=self.scheduler),
+				Stage("convert", self._stage_convert, self._pipeline_concurrency["convert"], self._pipeline_queue_size),
+				Stage("transcribe", self._stage_transcribe, self._pipeline_concurrency["transcribe"], self._pipeline_queue_size),
+			]
+		if mode == "worker":
+			stages.append(Stage("report", self._stage_report, self._pipeline_concurrency["deliver"], self._pipeline_queue_size))
+		else:
+			stages.append(Stage("deliver", self._stage_deliver, self._pipeline_concurrency["deliver"], self._pipeline_queue_size))
+		self.pipeline = Pipeline(stages, on_error=self._report_failure if mode == "worker" else self._on_job_failed)
+
+		# Metadata probed before queueing (duration, title, thumbnail, audio formats)
+		self.metadata_cache = TTLCache(ttl=6 * 60 * 60)  # 6 hours
+		self._probe_timeout = 20
+		self._probe_negative_ttl = 5 * 60  # unavailable media might come back
+
+		# yt-dlp kept loaded in worker processes instead of a new yt-dlp process per job
+		self.fetcher = MediaFetcher(workers=2)
+
+		# /transcribe_batch limits and where the result zips are written before sending
+		self._batch_max_items = 50
+		self._batch_probe_concurrency = 4
+		self._batch_dir = "./transcripts/batches"
+
+		# Admission control: wait estimates learned from completed jobs, backpressure past the threshold
+		self.throughput = ThroughputModel()
+		self._max_backlog_seconds = 60 * 60  # estimated STT time ahead of a new job
+		self._admission_policy = "defer"     # "defer" holds new jobs until the backlog drains, "reject" refuses them
+		self.deferred_jobs: collections.deque[TranscriptionJob] = collections.deque()
+
+		# Per-stage latency and event counters, also dumped to a JSON file for scrapers
+		self.metrics = Metrics()
+		self._metrics_path = f"./logs/metrics{self._state_suffix}.json"
+
 		# Background workers
-		self.worker.start()
+		self.pipeline.start()
 		self.stt_idle_task.start()
+		self.metrics_task.start()
+		self.admission_task.start()
+		if self.broker is not None:
+			self.broker_task.start()
 
 	def build_embed(self, title: str, color: discord.Color, builder_fn=None):
 		"""
 		Creates a base embed with Winston branding.
 		builder_fn(embed) can be provided to customise contents.
 		"""
+		embed = self._brand_embed(discord.Embed(title=title, color=color, timestamp=discord.utils.utcnow()))
+
+		if callable(builder_fn):
+			builder_fn(embed)
+
+		return embed
+
+	def _brand_embed(self, embed: discord.Embed) -> discord.Embed:
+		"""Set the Winston author and footer, also reapplied to embeds built on a worker (which has no bot user)."""
 		avatar = self.bot.user.display_avatar.url if self.bot.user else None
-		embed = discord.Embed(title=title, color=color, timestamp=discord.utils.utcnow())
 		embed.set_author(name="Winston", icon_url=avatar)
 		embed.set_footer(text="Winston v0.0.1a", icon_url=avatar)
+		return embed
 
-		if callable(builder_fn):
-			builder_fn(embed)
+	def _tier_config(self, tier: str) -> dict:
+		"""The STT config for a quality tier: the shared settings with the tier's model and beam size."""
+		return {
+			**self._stt_config,
+			"model": self._stt_tiers[tier]["model"],
+			"hyperparameters": {**self._stt_config["hyperparameters"], "beam_size": self._stt_tiers[tier]["beam_size"]},
+		}
+
+	def _cache_key(self, job: TranscriptionJob, tier: str) -> str:
+		return TranscriptCache.make_key(
+			job.source.id,
+			job.clip_id,
+			self._stt_tiers[tier]["model"],
+			self._stt_config["prompt"],
+			self._stt_tiers[tier]["beam_size"]
+		)
+
+	def _cached_transcript(self, job: TranscriptionJob) -> tuple[str | None, str | None]:
+		"""(cache key, transcript) from the requested tier or a better one (any tier if none was asked for), best first."""
+		tiers = list(self._stt_tiers)
+		if job.quality in self._stt_tiers:
+			tiers = tiers[:tiers.index(job.quality) + 1]
+		for tier in tiers:
+			key = self._cache_key(job, tier)
+			transcript = self.transcript_cache.get(key)
+			if transcript:  # older versions cached "" for media without speech
+				job.stt_tier = tier
+				return key, transcript
+		return None, None
+
+	def _coalesce_leader(self, job: TranscriptionJob) -> TranscriptionJob | None:
+		"""An in-flight job for the same media whose tier is at least as good as the one this job asked for."""
+		tiers = list(self._stt_tiers)
+		for leader in (self._inflight.get((*job.key, quality)) for quality in [None, *tiers]):
+			if leader is None:
+				continue
+			if job.quality not in self._stt_tiers:
+				return leader  # no preference, any transcript will do
+			# Until the leader's tier is picked, it's the one its user asked for (if any)
+			tier = leader.stt_tier or leader.quality
+			if tier in self._stt_tiers and tiers.index(tier) <= tiers.index(job.quality):
+				return leader
+		return None
+
+	def _pick_tier(self, job: TranscriptionJob) -> str:
+		"""The user's tier if it's installed, otherwise the first rule that the job's duration and the current backlog fit."""
+		if job.quality in self.stt_pools:
+			return job.quality
+		duration = job.duration or self.throughput.default_duration
+		backlog = self._backlog_seconds()
+		for tier, max_duration, max_backlog in self._stt_tier_rules:
+			if tier in self.stt_pools and duration <= max_duration and backlog <= max_backlog:
+				return tier
+		return self._stt_default_tier
+
+	def _build_result_message(self, job: TranscriptionJob, transcript: str, elapsed_str: str, file_path: str, cached: bool = False, mentions: str | None = None) -> dict:
+		"""Build the send kwargs (content, embed, file) for a finished transcript."""
+		mentions = mentions or job.mention
+		embed = self.build_embed(
+			title="✅ Transcription Complete",
+			color=discord.Color.green(),
+			builder_fn=lambda e: [
+				e.add_field(name="Source", value=f"[Open source]({job.canonical_url})", inline=False),
+				e.add_field(name="Time Taken", value=f"{elapsed_str} (cached)" if cached else elapsed_str, inline=True),
+				e.add_field(name="Quality", value=job.stt_tier.title(), inline=True) if job.stt_tier else None,
+				e.set_thumbnail(url=job.thumbnail_url) if job.thumbnail_url else None
+			]
+		)
+
+		if len(transcript) <= 1000:
+			embed.add_field(name="Transcript", value=transcript, inline=False)
+			return {
+				"content": f"{mentions} The transcript is ready.",
+				"embed": embed
+			}
 
+		return {
+			"content": f"{mentions} Here's the transcript file.",
+			"embed": embed,
+			"file": discord.File(file_path, filename=f"{job.clip_id}.txt")
+		}
+
+	def _build_progress_embed(self, job: TranscriptionJob, text: str, done: int, total: int, title: str = "🎙️ Transcribing...") -> discord.Embed:
+		"""The "Transcribing..." embed with the transcript so far, trimmed to Discord's description limit."""
+		if len(text) > 4000:
+			text = "…" + text[-3999:]
+		embed = self.build_embed(
+			title,
+			discord.Color.blurple(),
+			lambda e: [
+				e.set_thumbnail(url=job.thumbnail_url) if job.thumbnail_url else None,
+				e.add_field(name="Source", value=f"[Click to open source]({job.canonical_url})", inline=False),
+				self._add_media_field(e, job),
+				e.add_field(name="Progress", value=f"{done}/{total} segments", inline=True) if total else None,
+				e.add_field(name="Starts", value=f"<t:{int(job.starts_at)}:R>", inline=True) if job.starts_at and job.start_time is None else None,
+				e.add_field(name="ETA", value=f"<t:{int(job.eta)}:R>", inline=True) if job.eta and not total else None
+			]
+		)
+		embed.description = text or None
 		return embed
 
-	async def _ensure_stt_running(self):
+	def _build_batch_embed(self, batch: TranscriptionBatch, title: str = "📚 Batch Transcribing...") -> discord.Embed:
+		"""One embed for the whole batch: overall progress and a status line per item."""
+		lines = []
+		for index, job in enumerate(batch.items):
+			status = "✅" if index in batch.results else "❌" if index in batch.errors else "⏳"
+			name = job.metadata.title if job.metadata and job.metadata.title else job.media_id
+			lines.append(f"{status} [{name[:60]}]({job.canonical_url})")
+		items = ""
+		for n, line in enumerate(lines):
+			if len(items) + len(line) > 980:
+				items += f"…and {len(lines) - n} more"
+				break
+			items += line + "\n"
+
+		etas = [job.eta for job in batch.items if job.eta and job.batch_index not in batch.results and job.batch_index not in batch.errors]
+		return self.build_embed(
+			title,
+			discord.Color.green() if batch.done else discord.Color.blurple(),
+			lambda e: [
+				e.add_field(name="Progress", value=f"{len(batch.results)}/{len(batch.items)} transcribed", inline=True),
+				e.add_field(name="Failed", value=str(len(batch.errors)), inline=True) if batch.errors else None,
+				e.add_field(name="Skipped links", value=str(len(batch.skipped)), inline=True) if batch.skipped else None,
+				e.add_field(name="ETA", value=f"<t:{int(max(etas))}:R>", inline=True) if etas else None,
+				e.add_field(name="Items", value=items, inline=False)
+			]
+		)
+
+	def _write_batch_zip(self, batch: TranscriptionBatch) -> str:
+		"""Zip the batch's transcripts (and an errors.txt) and return the path."""
+		Path(self._batch_dir).mkdir(parents=True, exist_ok=True)
+		zip_path = os.path.join(self._batch_dir, f"batch_{batch.id}.zip")
+		with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+			for index, job in enumerate(batch.items):
+				if index in batch.results:
+					name = job.metadata.title if job.metadata and job.metadata.title else job.media_id
+					name = UNSAFE_FILENAME_REGEX.sub("_", name)[:80]
+					archive.writestr(f"{index + 1:02d} {name}.txt", batch.results[index])
+			if batch.errors:
+				archive.writestr("errors.txt", "\n".join(
+					f"{index + 1:02d} {batch.items[index].canonical_url}: {error}" for index, error in sorted(batch.errors.items())
+				))
+		return zip_path
+
+	async def _batch_item_done(self, job: TranscriptionJob, transcript: str | None = None, error: str | None = None):
+		"""Record a batch item's outcome, sending the zip once every item has one."""
+		batch = job.batch
+		if transcript is not None:
+			batch.results[job.batch_index] = transcript
+		else:
+			batch.errors[job.batch_index] = error or "Failed"
+		if not batch.done:
+			batch.progress.update(embed=self._build_batch_embed(batch))
+			return
+		if batch.delivered:
+			return
+		batch.delivered = True
+
+		elapsed = time.perf_counter() - batch.started
+		mins, secs = divmod(int(elapsed), 60)
+		elapsed_str = f"{mins}m {secs}s" if mins else f"{secs}s"
+		await batch.progress.finish(embed=self._build_batch_embed(batch, title="✅ Batch Transcribed"))
+
+		zip_path = await asyncio.get_running_loop().run_in_executor(None, self._write_batch_zip, batch)
+		embed = self.build_embed(
+			"✅ Batch Complete",
+			discord.Color.green(),
+			lambda e: [
+				e.add_field(name="Transcribed", value=f"{len(batch.results)}/{len(batch.items)}", inline=True),
+				e.add_field(name="Time Taken", value=elapsed_str, inline=True)
+			]
+		)
+		try:
+			await batch.channel.send(content=f"{batch.mention} Here are the transcripts.", embed=embed, file=discord.File(zip_path, filename=f"transcripts_{batch.id}.zip"))
+			self.metrics.incr("batches_completed")
+		except discord.DiscordException as e:
+			print(f"Failed to deliver batch {batch.id}: {e}")
+		finally:
+			os.remove(zip_path)
+
+	async def _batch_items_done(self, job: TranscriptionJob, transcript: str | None = None, error: str | None = None):
+		for member in [job, *job.followers]:
+			if member.batch is not None:
+				await self._batch_item_done(member, transcript, error)
+
+	def _add_media_field(self, embed: discord.Embed, job: TranscriptionJob):
+		if job.metadata is None or not job.metadata.title:
+			return
+		value = job.metadata.title
+		if job.duration:
+			mins, secs = divmod(int(job.duration), 60)
+			value += f" • {mins}:{secs:02d}"
+		if job.clipped:
+			value += f" • clip {utils.format_timestamp(job.clip_start or 0)}–{'end' if job.clip_end is None else utils.format_timestamp(job.clip_end)}"
+		embed.add_field(name="Media", value=value[:1024], inline=False)
+
+	def _backlog_seconds(self, deferred: bool = False) -> float:
+		"""Estimated STT time needed for everything queued or not yet transcribed (and deferred, if asked)."""
+		durations = [job.duration for job in self.scheduler]
+		if deferred:
+			durations += [job.duration for job in self.deferred_jobs]
+		durations += [job.duration for job in self.active_jobs.values() if job.transcript is None]
+		if self.mode == "bot":
+			servers = sum(worker["capacity"] for worker in self.broker.live_workers())
+		else:
+			servers = sum(pool.max_instances for pool in self.stt_pools.values())
+		return self.throughput.backlog_seconds(durations, servers)
+
+	async def _probe_metadata(self, job: TranscriptionJob) -> MediaMetadata | None:
 		"""
-		Lazily start the STT server if it's not running yet.
-		Waits a short warmup so the backend is ready to accept requests.
+		Ask the source for the media's metadata without downloading it (cached with a TTL).
+		Returns None if the probe couldn't finish, the job then just runs without it.
 		"""
-		async with self._stt_lock:
-			if self.stt is not None:
-				return
-
-			loop = asyncio.get_running_loop()
+		metadata = self.metadata_cache.get(job.media_key)
+		if metadata is not None:
+			self.metrics.incr("probe_cache_hits")
+		else:
+			try:
+				with self.metrics.timer("probe"):
+					info = await asyncio.wait_for(self._fetch_info(job), timeout=self._probe_timeout)
+			except asyncio.TimeoutError:
+				self.metrics.incr("probe_timeouts")
+				print(f"Metadata probe timed out for {job.canonical_url}")
+				return None
+			except FetcherCrashed as e:
+				# Not the media's fault, so it isn't cached as unavailable
+				self.metrics.incr("probe_fetcher_crashes")
+				print(f"Metadata probe failed for {job.canonical_url}: {e}")
+				return None
+			except FetchError as e:
+				metadata = MediaMetadata(available=False, error=str(e))
+				self.metadata_cache.put(job.media_key, metadata, ttl=self._probe_negative_ttl)
+			except (json.JSONDecodeError, AttributeError) as e:
+				print(f"Unreadable metadata for {job.canonical_url}: {e}")
+				return None
+			except Exception as e:
+				# Anything unexpected, the job is already in flight so it runs unprobed rather than hanging its followers
+				self.metrics.incr("probe_errors")
+				print(f"Metadata probe failed for {job.canonical_url}: {e!r}")
+				return None
+			else:
+				try:
+					metadata = job.source.parse_metadata(info)
+				except Exception as e:
+					print(f"Unreadable metadata for {job.canonical_url}: {e!r}")
+					return None
+				self.metadata_cache.put(job.media_key, metadata)
+
+		job.metadata = metadata
+		job.duration = job.clip_duration(metadata.duration)
+		job.thumbnail_url = metadata.thumbnail_url or job.thumbnail_url
+		return metadata
+
+	def _use_fetcher(self, source: MediaSourceStrategy) -> bool:
+		return source.in_process and self.fetcher.available
+
+	async def _fetch_info(self, job: TranscriptionJob) -> dict:
+		"""yt-dlp's info dict for the job's media, raises FetchError if it can't be found."""
+		if self._use_fetcher(job.source):
+			return await job.source.submit(self.fetcher, job, "probe")
 
-			def create_client():
-				port = utils.get_free_port()
-				return STTClient(
-					self._stt_host,
-					port,
-					self._stt_endpoint,
-					self._stt_config,
-					self._stt_log_dir
-				)
+		process = await asyncio.create_subprocess_exec(
+			*job.source.build_ytdlp_probe_cmd(job),
+			stdout=asyncio.subprocess.PIPE,
+			stderr=asyncio.subprocess.PIPE
+		)
+		try:
+			stdout, stderr = await process.communicate()
+		except asyncio.CancelledError:
+			process.kill()
+			raise
+		if process.returncode != 0:
+			errors = [line for line in stderr.decode(errors="replace").splitlines() if line.startswith("ERROR")]
+			raise FetchError(errors[-1] if errors else "The media could not be found.")
+		return json.loads(stdout)
 
-			# Run potentially blocking process spawn in a thread pool
-			self.stt = await loop.run_in_executor(None, create_client)
-			print("STT client started")
+	def _tier_load(self, tier: str) -> int:
+		return sum(1 for job in self.active_jobs.values() if job.stt_tier == tier)
 
-		# Warm-up period so the backend process is actually ready
-		await asyncio.sleep(self._stt_warmup_seconds)
-		self._stt_last_used = time.perf_counter()
+	async def _ensure_stt_running(self, tier: str):
+		"""
+		Lazily start the tier's STT servers, scaling its pool with the number of jobs using it.
+		Returns once at least one server is actually serving requests.
+		"""
+		await self.stt_pools[tier].scale(self._tier_load(tier))
+
+	def _assign_tier(self, job: TranscriptionJob):
+		"""Pick the job's tier, score whether its servers were already up and start warming them."""
+		job.stt_tier = self._pick_tier(job)
+		self.job_store.update(job.id, stt_tier=job.stt_tier)
+		self._score_stt_start(job.stt_tier)
+		self._prewarm_stt(job.stt_tier)
+
+	def _prewarm_stt(self, tier: str):
+		"""Speculatively start the tier's STT servers in the background so model loading overlaps the download."""
+		task = asyncio.create_task(self.stt_pools[tier].scale(self._tier_load(tier) + 1, wait=False))
+		self._prewarm_tasks.add(task)
+
+		def _done(t: asyncio.Task):
+			self._prewarm_tasks.discard(t)
+			if not t.cancelled() and t.exception():
+				print(f"STT pre-warm failed: {t.exception()}")
+
+		task.add_done_callback(_done)
+
+	def _stt_resident_bytes(self, tier: str, rss: int | None) -> int:
+		"""Measured server memory, or the model size where it can't be measured (the model is most of it)."""
+		if rss is not None:
+			return rss
+		model = self._stt_tiers[tier]["model"]
+		return os.path.getsize(model) if os.path.exists(model) else 0
+
+	def _count_memory_saved(self, size: int, seconds: float):
+		"""Memory saved against the fixed idle timeout, negative when a server was kept up longer."""
+		self.metrics.incr("stt_memory_saved_mib_seconds", round(size / 1024 ** 2 * seconds))
+
+	def _observe_arrival(self):
+		"""Teach the keep-alive policy about a request as it's queued, the bot passes it on to every worker."""
+		now = time.time()
+		if self.broker is not None:
+			try:
+				self.broker.record_arrival(now)
+			except sqlite3.Error as e:
+				print(f"Failed to record the arrival in the broker: {e}")
+		else:
+			self.keep_alive.observe(now)
+
+	def _score_stt_start(self, tier: str):
+		"""Count whether the tier's servers were warm when a job picked it, against the fixed idle timeout."""
+		now = time.time()
+		pool = self.stt_pools[tier]
+		cold = not pool.warm
+		self.metrics.incr("stt_cold_starts" if cold else "stt_warm_starts")
+
+		# Warm only because the policy kept idle servers past the fixed timeout
+		idle = pool.idle_instances()
+		if self._stt_adaptive_keep_alive and idle and not pool.busy and min(seconds for seconds, _ in idle) >= self._stt_idle_timeout:
+			self.metrics.incr("stt_cold_starts_avoided")
+			for seconds, rss in idle:
+				self._count_memory_saved(self._stt_resident_bytes(tier, rss), self._stt_idle_timeout - seconds)
+		self._settle_early_shutdowns(now, arrival_tier=tier, cold=cold)
+
+	def _settle_early_shutdowns(self, now: float, arrival_tier: str | None = None, cold: bool = False):
+		"""
+		Score servers the policy shut down before the fixed timeout would have, once a request for their
+		tier arrives (the fixed timeout would have served it warm if it was still within) or the deadline passes.
+		"""
+		added = False
+		pending = []
+		for tier, stopped_at, deadline, size in self._stt_early_shutdowns:
+			if tier != arrival_tier and now < deadline:
+				pending.append((tier, stopped_at, deadline, size))
+				continue
+			self._count_memory_saved(size, min(now, deadline) - stopped_at)
+			added = added or (tier == arrival_tier and cold and now < deadline)
+		self._stt_early_shutdowns = pending
+		if added:
+			self.metrics.incr("stt_cold_starts_added")
 
 	@discord.app_commands.command(name="transcribe", description="Transcribe a video link (YouTube, Reddit)")
-	@discord.app_commands.describe(link="The video URL")
-	async def transcribe(self, interaction: discord.Interaction, link: str):
-		source: MediaSourceStrategy | None = None
-		for s in self.sources:
-			if s.can_handle(link):
-				source = s
-				break
-
+	@discord.app_commands.describe(
+		link="The video URL",
+		start="Only transcribe from here, eg. 1:30 or 90 (YouTube t= links work too)",
+		end="Stop transcribing here, eg. 2:45",
+		quality="Model and beam size to use, by default picked from the media length and queue"
+	)
+	async def transcribe(self, interaction: discord.Interaction, link: str, start: str | None = None, end: str | None = None, quality: QualityTier | None = None):
+		source = self._source_for(link)
 		if not source:
 			embed = self.build_embed(
 				"❌ Unsupported Link",
@@ -261,26 +1008,232 @@ class WinstonCog(CogModule):
 			await interaction.response.send_message(embed=embed, ephemeral=False)
 			return
 
-		embed = self.build_embed(
-			"🎙️ Transcribing...",
+		range_error = self._apply_time_range(job, link, start, end)
+		if range_error:
+			embed = self.build_embed(
+				"❌ Invalid Time Range",
+				discord.Color.red(),
+				lambda e: e.add_field(name="Error", value=range_error)
+			)
+			await interaction.response.send_message(embed=embed, ephemeral=False)
+			return
+
+		job.quality = quality
+		await self._enqueue_job(job, interaction)
+
+	@discord.app_commands.command(name="transcribe_batch", description="Transcribe a playlist or several links into one zip")
+	@discord.app_commands.describe(
+		links="A playlist URL, or video URLs separated by spaces",
+		quality="Model and beam size to use, by default picked from the media length and queue"
+	)
+	async def transcribe_batch(self, interaction: discord.Interaction, links: str, quality: QualityTier | None = None):
+		batch = TranscriptionBatch(interaction)
+		await interaction.response.send_message(embed=self.build_embed(
+			"📚 Preparing Batch...",
 			discord.Color.blurple(),
-			lambda e: [
-				e.set_thumbnail(url=job.thumbnail_url) if job.thumbnail_url else None,
-				e.add_field(name="Source", value=f"[Click to open source]({job.canonical_url})", inline=False)
-			]
-		)
+			lambda e: e.add_field(name="Status", value="Expanding links...", inline=False)
+		))
+		batch.progress = ProgressMessage(await interaction.original_response(), self._progress_interval)
+
+		# 🔗 Expand playlists through their source, skipping duplicates and anything unsupported
+		seen = set()
+		for source, url in await self._expand_links(batch, links):
+			if len(batch.items) >= self._batch_max_items:
+				batch.skipped.append(url)
+				continue
+			job = source.create_job(interaction, url)
+			if job is None or self._apply_time_range(job, url):
+				batch.skipped.append(url)
+				continue
+			if job.key in seen:
+				continue
+			seen.add(job.key)
+			job.quality = quality
+			batch.add(job)
+
+		if not batch.items:
+			await batch.progress.finish(embed=self.build_embed(
+				"❌ Nothing To Transcribe",
+				discord.Color.red(),
+				lambda e: e.add_field(
+					name="Error",
+					value="None of those links are supported video sources or playlists.\n"
+					      "Currently supported: **YouTube**, **Reddit (v.redd.it / reddit.com)**."
+				)
+			))
+			return
 
-		await interaction.response.send_message(embed=embed, ephemeral=False)
+		probe_slots = asyncio.Semaphore(self._batch_probe_concurrency)
 
-		self.pending_jobs.append(job)
-		await self.queue.put(job)
+		# 🚀 Fan the items out, the fair scheduler keeps a big batch from starving other users
+		await asyncio.gather(*(self._enqueue_job(job, probe_slots=probe_slots) for job in batch.items))
+		if not batch.delivered:
+			batch.progress.update(embed=self._build_batch_embed(batch))
+
+	async def _enqueue_job(self, job: TranscriptionJob, interaction: discord.Interaction | None = None, probe_slots: asyncio.Semaphore | None = None):
+		"""
+		Take a new job from the cache, an in-flight job or the queue, for /transcribe and /transcribe_batch alike.
+		A single request is answered through its interaction, batch items report to their batch.
+		"""
+		# ⚡ Answer straight from the transcript cache when we've seen this media before
+		start_time = time.perf_counter()
+		cache_key, transcript = self._cached_transcript(job)
+		if transcript is not None:
+			self.metrics.incr("cache_hits")
+			if interaction is None:
+				await self._batch_item_done(job, transcript=transcript)
+				return
+			elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+			message = self._build_result_message(job, transcript, f"{elapsed_ms}ms", self.transcript_cache.path_for(cache_key), cached=True)
+			await interaction.response.send_message(**message)
+			print(f"Cache hit for {job.canonical_url}")
+			return
+
+		self.metrics.incr("cache_misses")
+
+		# 🔗 Attach to an in-flight job for the same media instead of running it again
+		leader = self._coalesce_leader(job)
+		if leader is not None:
+			self.metrics.incr("coalesced")
+			leader.followers.append(job)
+			job.id = self.job_store.add(job.to_record(), leader_id=leader.id)
+			if interaction is None:
+				return
+			embed = self.build_embed(
+				"🎙️ Already Transcribing...",
+				discord.Color.blurple(),
+				lambda e: [
+					e.set_thumbnail(url=job.thumbnail_url) if job.thumbnail_url else None,
+					e.add_field(name="Source", value=f"[Click to open source]({job.canonical_url})", inline=False),
+					e.add_field(name="Status", value="This media is already being transcribed, you'll be notified when it's done.", inline=False)
+				]
+			)
+			await interaction.response.send_message(embed=embed, ephemeral=False)
+			print(f"Coalesced request for {job.canonical_url} into in-flight job")
+			return
+
+		if interaction is not None:
+			embed = self.build_embed(
+				"🎙️ Transcribing...",
+				discord.Color.blurple(),
+				lambda e: [
+					e.set_thumbnail(url=job.thumbnail_url) if job.thumbnail_url else None,
+					e.add_field(name="Source", value=f"[Click to open source]({job.canonical_url})", inline=False)
+				]
+			)
+			await interaction.response.send_message(embed=embed, ephemeral=False)
+			job.progress = ProgressMessage(await interaction.original_response(), self._progress_interval)
+
+		job.id = self.job_store.add(job.to_record())
+		self._inflight[job.inflight_key] = job
+
+		# 🔎 Probe before queueing: reject unavailable media early and learn the duration for scheduling
+		async with probe_slots or contextlib.nullcontext():
+			metadata = await self._probe_metadata(job)
+		if metadata is not None and not metadata.available:
+			self.metrics.incr("probe_rejections")
+			self._discard_job(job)
+			await self._notify_failure(job, PipelineError("Media Unavailable", "That media can't be downloaded. It might be private, removed or region locked.", metadata.error))
+			return
+		if job.duration == 0:
+			self._discard_job(job)
+			await self._notify_failure(job, PipelineError("Invalid Time Range", "The start time is past the end of the media.", f"clip {job.clip_id}"))
+			return
+
+		await self._admit_job(job)
+
+
+	def _apply_time_range(self, job: TranscriptionJob, link: str, start: str | None = None, end: str | None = None) -> str | None:
+		"""Set the job's window from the start/end options or the link itself, returns an error message if they're invalid."""
+		link_start, link_end = job.source.time_range(link)
+		clip_start = utils.parse_timestamp(start) if start else link_start
+		clip_end = utils.parse_timestamp(end) if end else link_end
+		if (start and clip_start is None) or (end and clip_end is None):
+			return "Times should look like `90`, `1:30`, `1:02:03` or `1m30s`."
+		if clip_end is not None and clip_end <= (clip_start or 0):
+			return "The end time has to be after the start time."
+		job.clip_start = clip_start or None  # starting at 0 is just the whole media
+		job.clip_end = clip_end
+		return None
+
+	def _source_for(self, link: str) -> MediaSourceStrategy | None:
+		for source in self.sources:
+			if source.can_handle(link):
+				return source
+		return None
+
+	async def _expand_links(self, batch: TranscriptionBatch, links: str) -> list[tuple[MediaSourceStrategy, str]]:
+		"""Split the links and expand playlists into their items, unusable links go to batch.skipped."""
+		expanded = []
+		for link in re.split(r"[\s,]+", links.strip()):
+			source = self._source_for(link) if link else None
+			if source is None:
+				if link:
+					batch.skipped.append(link)
+				continue
+			if not source.is_playlist(link):
+				expanded.append((source, link))
+				continue
+			try:
+				expanded += [(source, url) for url in await self._fetch_playlist(source, link)]
+			except (FetchError, FetcherCrashed, json.JSONDecodeError) as e:
+				print(f"Couldn't expand playlist {link}: {e}")
+				batch.skipped.append(link)
+		return expanded
+
+	async def _fetch_playlist(self, source: MediaSourceStrategy, url: str) -> list[str]:
+		if self._use_fetcher(source):
+			info = await source.submit_playlist(self.fetcher, url)
+		else:
+			process = await asyncio.create_subprocess_exec(
+				*source.build_ytdlp_playlist_cmd(url),
+				stdout=asyncio.subprocess.PIPE,
+				stderr=asyncio.subprocess.PIPE
+			)
+			stdout, stderr = await process.communicate()
+			if process.returncode != 0:
+				raise FetchError(stderr.decode(errors="replace").strip())
+			info = json.loads(stdout)
+		return source.playlist_urls(info)
+
+	async def _admit_job(self, job: TranscriptionJob):
+		"""Queue a probed job, or defer/reject it when the backlog is already too long."""
+		self._observe_arrival()
+
+		# 🚦 Admission control: estimate the wait, push back when the backlog is already too long.
+		# Jobs deferred earlier go first, a new one only skips the line if they've all been let in
+		await self._release_deferred()
+		backlog = self._backlog_seconds()
+		self._estimate_times(job, self._backlog_seconds(deferred=True))
+		if backlog > self._max_backlog_seconds or self.deferred_jobs:
+			wait = f"about {int(backlog // 60)} minutes of audio is already queued"
+			if self._admission_policy == "reject":
+				self.metrics.incr("admission_rejected")
+				self._discard_job(job)
+				await self._notify_failure(job, PipelineError("Queue Full", f"Winston is too busy right now ({wait}). Please try again later.", f"backlog {backlog:.0f}s"))
+				return
+			self.metrics.incr("admission_deferred")
+			self.deferred_jobs.append(job)
+			if job.progress is not None:
+				job.progress.update(embed=self._build_progress_embed(job, f"⏸️ Deferred, {wait}. It will start once the queue drains.", 0, 0))
+			return
+
+		# 🎚️ Pick the tier now that the duration is known and warm it up while the job waits, download keeps it
+		if self.mode != "bot":
+			self._assign_tier(job)
+
+		if job.progress is not None:
+			job.progress.update(embed=self._build_progress_embed(job, "", 0, 0))
+		await self.pipeline.put(job)
 
 	@discord.app_commands.command(name="queue", description="View current transcription job queue")
 	async def view_queue(self, interaction: discord.Interaction):
-		pending = len(self.pending_jobs)
+		pending = len(self.scheduler)
 		active = len(self.active_jobs)
+		deferred = len(self.deferred_jobs)
+		shown = 10  # jobs listed per section, the rest are only counted
 
-		if pending == 0 and active == 0:
+		if pending == 0 and active == 0 and deferred == 0:
 			embed = self.build_embed(
 				"📭 Transcription Queue Empty",
 				discord.Color.greyple(),
@@ -293,202 +1246,860 @@ class WinstonCog(CogModule):
 			await interaction.response.send_message(embed=embed, ephemeral=False)
 			return
 
-		def format_jobs(title, jobs):
+		def format_jobs(title, jobs, total):
 			if not jobs:
 				return f"**No {title.lower()} jobs.**"
 			lines = []
 			for i, job in enumerate(jobs, 1):
-				lines.append(f"**{i}.** [Source]({job.canonical_url}) • {job.interaction.user.mention}")
+				waiting = f" (+{len(job.followers)} waiting)" if job.followers else ""
+				lines.append(f"**{i}.** [Source]({job.canonical_url}) • {job.mention}{waiting}")
+			if total > len(jobs):
+				lines.append(f"…and {total - len(jobs)} more")
 			return "\n".join(lines)
 
+		active_jobs = list(itertools.islice(self.active_jobs.values(), shown))
+		pending_jobs = self.scheduler.peek(shown)
+		deferred_jobs = list(itertools.islice(self.deferred_jobs, shown))
+		backlog = self._backlog_seconds()
+		workers = self.broker.live_workers() if self.mode == "bot" else []
 		embed = self.build_embed(
 			"📋 Transcription Queue",
 			discord.Color.orange(),
 			lambda e: [
-				e.add_field(name=f"🕓 Active Jobs ({active})", value=format_jobs("Active", self.active_jobs), inline=False),
-				e.add_field(name=f"⏳ Pending Jobs ({pending})", value=format_jobs("Pending", self.pending_jobs), inline=False)
+				e.add_field(name=f"🕓 Active Jobs ({active})", value=format_jobs("Active", active_jobs, active), inline=False),
+				e.add_field(name=f"⏳ Pending Jobs ({pending})", value=format_jobs("Pending", pending_jobs, pending), inline=False),
+				e.add_field(name=f"⏸️ Deferred Jobs ({deferred})", value=format_jobs("Deferred", deferred_jobs, deferred), inline=False) if deferred else None,
+				e.add_field(name="Estimated wait", value=f"~{int(backlog // 60)} min", inline=False),
+				e.add_field(name="🛠️ Workers", value=f"{len(workers)} online ({sum(w['capacity'] for w in workers)} job slots)", inline=False) if self.mode == "bot" else None
 			]
 		)
 
 		await interaction.response.send_message(embed=embed, ephemeral=False)
 
-	@tasks.loop(seconds=1)
-	async def worker(self):
-		if self.queue.empty():
-			return
+	@discord.app_commands.command(name="cancel", description="Cancel your transcription requests that haven't started yet")
+	async def cancel(self, interaction: discord.Interaction):
+		cancelled = 0
+		for leader in list(self._inflight.values()):
+			# Requests that piggyback on someone else's job just stop waiting for it
+			for follower in [f for f in leader.followers if f.user_id == interaction.user.id]:
+				leader.followers.remove(follower)
+				self.job_store.remove(follower.id)
+				if follower.batch is not None:
+					await self._batch_item_done(follower, error="Cancelled")
+				cancelled += 1
+
+			if leader.user_id != interaction.user.id:
+				continue
+			if leader.followers:
+				continue  # others are still waiting on it
+			if leader in self.deferred_jobs:
+				self.deferred_jobs.remove(leader)
+			elif not self.scheduler.cancel(leader) and not self._cancel_remote(leader):
+				continue
+			self._discard_job(leader)
+			if leader.batch is not None:
+				await self._batch_item_done(leader, error="Cancelled")
+			cancelled += 1
 
-		job: TranscriptionJob = await self.queue.get()
-		if job in self.pending_jobs:
-			self.pending_jobs.remove(job)
-		self.active_jobs.append(job)
+		embed = self.build_embed(
+			"🛑 Requests Cancelled" if cancelled else "📭 Nothing To Cancel",
+			discord.Color.greyple(),
+			lambda e: e.add_field(
+				name="Status",
+				value=f"Cancelled **{cancelled}** pending request(s)." if cancelled else "You have no pending transcription requests.",
+				inline=False
+			)
+		)
+		await interaction.response.send_message(embed=embed, ephemeral=True)
 
-		start_time = time.perf_counter()  # ⏱️ start tracking
-		print(f"Starting transcription for {job.canonical_url}")
+	def _cancel_remote(self, job: TranscriptionJob) -> bool:
+		"""Bot mode: withdraw a job from the broker, only possible before a worker has leased it."""
+		waiter = self._remote_jobs.get(job.task_id)
+		if waiter is None or not self.broker.cancel(job.task_id):
+			return False
+		waiter[1].set_result(None)
+		return True
 
-		# 🧱 Step 1: Download audio using yt_dlp via strategy
-		os.makedirs("downloads", exist_ok=True)
-		audio_path = os.path.join("downloads", f"{job.media_id}.mp3")
+	def _build_ffmpeg_cmd(self, source: str, target: str, fmt: str = "wav", input_args: tuple[str, ...] = ()) -> list[str]:
+		ffmpeg_path = "ffmpeg"  # assumes ffmpeg.exe is in PATH
+		return [
+			ffmpeg_path, "-y",
+			"-benchmark",          # report CPU time for the stage metrics
+			*input_args,
+			"-i", source,
+			"-ac", "1",            # mono
+			"-ar", "16000",        # 16 kHz
+			"-f", fmt,
+			target
+		]
 
-		ytdlp_cmd = job.source.build_ytdlp_cmd(job, audio_path)
+	def _observe_ffmpeg_cpu(self, stderr: bytes):
+		"""Record the CPU seconds ffmpeg reported with -benchmark."""
+		match = FFMPEG_BENCH_REGEX.search(stderr.decode(errors="replace"))
+		if match:
+			self.metrics.observe("ffmpeg_cpu", float(match["utime"]) + float(match["stime"]))
+
+	def _observe_format_savings(self, job: TranscriptionJob):
+		"""Estimated bytes fetched for the selected format, and saved compared to the largest audio format."""
+		chosen = job.source.select_audio_format(job)
+		if chosen is None or not job.duration:
+			return
+		# Per second of media, so a clip only counts its share of the whole file
+		fetched = self._format_byte_rate(chosen, job.metadata.duration) * job.duration
+		largest = max(self._format_byte_rate(f, job.metadata.duration) for f in job.metadata.audio_formats) * job.duration
+		self.metrics.incr("fetch_bytes", int(fetched))
+		self.metrics.incr("fetch_bytes_saved", int(largest - fetched))
+
+	@staticmethod
+	def _format_byte_rate(fmt: dict, media_duration: float | None) -> float:
+		"""Bytes per second of media for a format: its file size over the whole media, or else its bitrate."""
+		if fmt["filesize"] and media_duration:
+			return fmt["filesize"] / media_duration
+		return (fmt["abr"] or 0) * 125  # kbps → bytes/s
+
+	async def _download_audio(self, job: TranscriptionJob) -> str:
+		"""
+		Download the audio to downloads/ (unless it's already there) and return its path.
+		The file is kept in the source's own codec, ffmpeg resamples it directly (no mp3 re-encode).
+		It stays pinned until convert has read it (_release_audio), so other jobs' commits can't evict it while it waits.
+		"""
+		audio_path = self.artifacts.get(job.source.id, job.clip_id, "audio")
+		if audio_path is not None:
+			self.metrics.incr("artifact_hits.audio")
+			self.artifacts.pin(audio_path)
+			return audio_path
+
+		# yt-dlp writes .part files and renames them itself, so it can write to the final path
+		audio_path = self.artifacts.path_for(job.source.id, job.clip_id, "audio")
+		self.artifacts.pin(audio_path)  # before the commit, which evicts too
+		try:
+			return await self._fetch_audio(job, audio_path)
+		except BaseException:
+			self.artifacts.unpin(audio_path)
+			raise
+
+	def _release_audio(self, job: TranscriptionJob):
+		if job.audio_path is not None:
+			self.artifacts.unpin(job.audio_path)
+			job.audio_path = None
+
+	async def _fetch_audio(self, job: TranscriptionJob, audio_path: str) -> str:
+		if self._use_fetcher(job.source):
+			try:
+				audio_path = await job.source.submit(self.fetcher, job, "download", audio_path) or audio_path
+			except FetchError as e:
+				raise PipelineError("Download Failed", "Could not download audio. The media might be private or blocked.", str(e))
+			except FetcherCrashed as e:
+				raise PipelineError("Download Failed", "The media fetcher crashed, please try again.", str(e))
+			print(f"Download complete → {audio_path}")
+			self.metrics.incr("transcodes_avoided")
+			return self.artifacts.commit(job.source.id, job.clip_id, "audio", audio_path)
 
 		process = await asyncio.create_subprocess_exec(
-			*ytdlp_cmd,
+			*job.source.build_ytdlp_cmd(job, audio_path),
 			stdout=asyncio.subprocess.PIPE,
 			stderr=asyncio.subprocess.PIPE
 		)
 		stdout, stderr = await process.communicate()
 
 		if process.returncode != 0:
-			print(f"yt_dlp failed:\n{stderr.decode()}")
-			embed = self.build_embed(
-				"❌ Download Failed",
-				discord.Color.red(),
-				lambda e: e.add_field(
-					name="Error",
-					value="Could not download audio. The media might be private or blocked."
-				)
-			)
-			await job.interaction.channel.send(embed=embed)
-			self.active_jobs.remove(job)
-			return
+			raise PipelineError("Download Failed", "Could not download audio. The media might be private or blocked.", stderr.decode(errors="replace"))
 
 		print(f"Download complete → {audio_path}")
+		self.metrics.incr("transcodes_avoided")
+		return self.artifacts.commit(job.source.id, job.clip_id, "audio", audio_path)
 
-		# 🎧 Step 2: Convert to mono 16 kHz WAV (Whisper-friendly)
-		wav_path = os.path.join("downloads", f"{job.media_id}_16k.wav")
-
-		ffmpeg_path = "ffmpeg"  # assumes ffmpeg.exe is in PATH
-		ffmpeg_cmd = [
-			ffmpeg_path, "-y",
-			"-i", audio_path,
-			"-ac", "1",            # mono
-			"-ar", "16000",        # 16 kHz
-			"-f", "wav",
-			wav_path
-		]
-
+	async def _convert_audio(self, job: TranscriptionJob, audio_path: str) -> str:
+		"""Convert to raw 16 kHz PCM in the artifact store and return its path."""
+		tmp_path = self.artifacts.temp_path_for(job.source.id, job.clip_id, "pcm")
 		ffmpeg_proc = await asyncio.create_subprocess_exec(
-			*ffmpeg_cmd,
+			*self._build_ffmpeg_cmd(audio_path, tmp_path, fmt="s16le"),
 			stdout=asyncio.subprocess.PIPE,
 			stderr=asyncio.subprocess.PIPE
 		)
 		stdout, stderr = await ffmpeg_proc.communicate()
 
 		if ffmpeg_proc.returncode != 0:
-			print(f"ffmpeg conversion failed:\n{stderr.decode()}")
-			embed = self.build_embed(
-				"❌ Audio Conversion Failed",
-				discord.Color.red(),
-				lambda e: e.add_field(
-					name="Error",
-					value="Failed to convert audio to mono 16 kHz WAV for Whisper."
-				)
-			)
-			await job.interaction.channel.send(embed=embed)
-			self.active_jobs.remove(job)
+			raise PipelineError("Audio Conversion Failed", "Failed to convert audio to mono 16 kHz WAV for Whisper.", stderr.decode(errors="replace"))
+
+		self._observe_ffmpeg_cpu(stderr)
+		pcm_path = self.artifacts.commit(job.source.id, job.clip_id, "pcm")
+		print(f"Converted → {pcm_path}")
+		return pcm_path
+
+	def _use_pcm(self, job: TranscriptionJob, pcm_path: str):
+		"""Memory-map converted audio for a job, so it is paged in as it's uploaded, and pin it."""
+		self.artifacts.pin(pcm_path)
+		job.pcm_path = pcm_path
+		if os.path.getsize(pcm_path) == 0:
+			job.pcm = b""
 			return
+		with open(pcm_path, "rb") as f:
+			job.pcm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+	def _release_pcm(self, job: TranscriptionJob):
+		job.pcm = None
+		if job.pcm_path is not None:
+			self.artifacts.unpin(job.pcm_path)
+			job.pcm_path = None
+
+	@staticmethod
+	async def _pump_pcm(ffmpeg_proc: asyncio.subprocess.Process, sink: BinaryIO) -> tuple[int, bytes]:
+		"""Copy ffmpeg's PCM output into sink as it arrives, returns (bytes written, ffmpeg's stderr)."""
+		async def pump() -> int:
+			written = 0
+			while chunk := await ffmpeg_proc.stdout.read(256 * 1024):
+				sink.write(chunk)
+				written += len(chunk)
+			return written
+
+		written, stderr = await asyncio.gather(pump(), ffmpeg_proc.stderr.read())
+		await ffmpeg_proc.wait()
+		return written, stderr
+
+	async def _stream_audio_pcm(self, job: TranscriptionJob, sink: BinaryIO) -> int:
+		"""
+		Pipe yt-dlp's stdout straight into ffmpeg's stdin and write the 16 kHz mono PCM to sink as it arrives,
+		so conversion overlaps with the download. Returns the number of PCM bytes.
+		With the fetcher pool, yt-dlp only resolves the media URL and ffmpeg streams it directly.
+		"""
+		if self._use_fetcher(job.source):
+			try:
+				stream = await job.source.submit(self.fetcher, job, "resolve")
+			except FetchError as e:
+				raise PipelineError("Download Failed", "Could not download audio. The media might be private or blocked.", str(e))
+			except FetcherCrashed as e:
+				raise PipelineError("Download Failed", "The media fetcher crashed, please try again.", str(e))
+			if stream is not None:
+				return await self._stream_url_pcm(job, stream, sink)
+			# Fragmented formats (eg. DASH) still need yt-dlp to download them
+
+		read_fd, write_fd = os.pipe()
+		ytdlp_proc = None
+		try:
+			ytdlp_proc = await asyncio.create_subprocess_exec(
+				*job.source.build_ytdlp_stream_cmd(job),
+				stdout=write_fd,
+				stderr=asyncio.subprocess.PIPE
+			)
+			ffmpeg_proc = await asyncio.create_subprocess_exec(
+				*self._build_ffmpeg_cmd("pipe:0", "pipe:1", fmt="s16le"),
+				stdin=read_fd,
+				stdout=asyncio.subprocess.PIPE,
+				stderr=asyncio.subprocess.PIPE
+			)
+		except Exception:
+			if ytdlp_proc is not None:
+				ytdlp_proc.kill()
+			raise
+		finally:
+			# The children hold their own copies, ours must go so EOF propagates
+			os.close(read_fd)
+			os.close(write_fd)
 
-		print(f"Converted → {wav_path}")
-
-		# Ensure STT backend is up before we send audio
-		await self._ensure_stt_running()
+		(_, ytdlp_err), (written, ffmpeg_err) = await asyncio.gather(
+			ytdlp_proc.communicate(),
+			self._pump_pcm(ffmpeg_proc, sink)
+		)
 
-		# 🧬 Step 3: Encode to base64 for Whisper
-		with open(wav_path, "rb") as f:
-			audio_b64 = base64.b64encode(f.read()).decode()
+		if ytdlp_proc.returncode != 0:
+			raise PipelineError("Download Failed", "Could not download audio. The media might be private or blocked.", ytdlp_err.decode(errors="replace"))
+		if ffmpeg_proc.returncode != 0:
+			raise PipelineError("Audio Conversion Failed", "Failed to convert audio to mono 16 kHz WAV for Whisper.", ffmpeg_err.decode(errors="replace"))
+
+		self._observe_ffmpeg_cpu(ffmpeg_err)
+		print(f"Streamed and converted {job.canonical_url} ({written} bytes of PCM)")
+		return written
+
+	async def _stream_url_pcm(self, job: TranscriptionJob, stream: dict, sink: BinaryIO) -> int:
+		"""Have ffmpeg read a resolved media URL and write it to sink as 16 kHz mono PCM."""
+		headers = "".join(f"{name}: {value}\r\n" for name, value in stream["http_headers"].items())
+		input_args = ("-headers", headers) if headers else ()
+		if job.clipped:
+			# Input seeking, so ffmpeg requests only the byte ranges around the window
+			input_args += ("-ss", f"{job.clip_start or 0:g}")
+			if job.clip_end is not None:
+				input_args += ("-t", f"{job.clip_end - (job.clip_start or 0):g}")
+		ffmpeg_proc = await asyncio.create_subprocess_exec(
+			*self._build_ffmpeg_cmd(stream["url"], "pipe:1", fmt="s16le", input_args=input_args),
+			stdout=asyncio.subprocess.PIPE,
+			stderr=asyncio.subprocess.PIPE
+		)
+		written, ffmpeg_err = await self._pump_pcm(ffmpeg_proc, sink)
 
-		# 🎙️ Step 4: Transcribe
-		try:
-			self._stt_busy = True
-			if not self.stt:
-				raise RuntimeError("STT client not initialised")
-			transcript = self.stt.transcribe(audio_b64)
-		except Exception as e:
-			print(f"Transcription failed: {e}")
-			embed = self.build_embed(
-				"❌ Transcription Failed",
-				discord.Color.red(),
-				lambda e: e.add_field(name="Error", value=f"```\n{e}\n```")
+		if ffmpeg_proc.returncode != 0:
+			raise PipelineError("Download Failed", "Could not download audio. The media might be private or blocked.", ffmpeg_err.decode(errors="replace"))
+
+		self._observe_ffmpeg_cpu(ffmpeg_err)
+		print(f"Streamed and converted {job.canonical_url} ({written} bytes of PCM)")
+		return written
+
+	async def _transcribe_segment(self, tier: str, pcm: list[memoryview], semaphore: asyncio.Semaphore) -> str:
+		"""Upload and transcribe one segment, retrying transient failures with backoff."""
+		async with semaphore:
+			for attempt in range(self._stt_segment_retries + 1):
+				try:
+					return await self.stt_pools[tier].transcribe(pcm)
+				except (aiohttp.ClientError, asyncio.TimeoutError, NoHealthyServer) as e:
+					if attempt == self._stt_segment_retries:
+						raise
+					print(f"Segment transcription failed ({e}), retrying...")
+					self.metrics.incr("stt_segment_retries")
+					await asyncio.sleep(2 ** attempt)
+					# The server may have crashed or been reaped since the stage started, replace it before retrying
+					await self._ensure_stt_running(tier)
+
+	async def _transcribe_pcm(self, job: TranscriptionJob) -> str:
+		"""
+		Split audio at silence boundaries into bounded segments,
+		transcribe them concurrently and stitch the text back together in order.
+		Finished segments are recorded so a resumed job only transcribes what's left.
+		"""
+		regions = [(0, len(job.pcm))]
+		if self._vad_prepass:
+			# 🔇 Only upload the speech, whisper-server's own VAD still runs on what's sent
+			with self.metrics.timer("vad"):
+				regions = await asyncio.get_running_loop().run_in_executor(None, Audio.detect_speech, job.pcm)
+			kept = sum(end - start for start, end in regions)
+			self.metrics.incr("vad_seconds_kept", int(kept / Audio.BYTES_PER_SECOND))
+			self.metrics.incr("vad_seconds_removed", int((len(job.pcm) - kept) / Audio.BYTES_PER_SECOND))
+			if not regions:
+				return ""
+
+		with self.metrics.timer("split"):
+			segments = Audio.speech_segments(
+				job.pcm,
+				regions,
+				max_segment_seconds=self._stt_segment_seconds,
+				first_segment_seconds=self._stt_first_segment_seconds
 			)
-			await job.interaction.channel.send(embed=embed)
-			self.active_jobs.remove(job)
-			return
-		finally:
-			self._stt_busy = False
-			self._stt_last_used = time.perf_counter()
+		semaphore = asyncio.Semaphore(self._stt_parallelism)
+		view = memoryview(job.pcm)  # segments are slices of the one buffer (or mmap), not copies
+		done = self.job_store.segments(job.id)
+		texts: list[str | None] = [done.get(idx) for idx in range(len(segments))]
+
+		def report_progress():
+			# Only the in-order prefix is shown, so the text never has holes in it
+			prefix = []
+			for text in texts:
+				if text is None:
+					break
+				prefix.append(text)
+			if prefix and "first_text" not in job.marks:
+				job.marks["first_text"] = time.perf_counter()
+				self.metrics.observe("first_text", job.marks["first_text"] - job.enqueued_at)
+			if job.progress is not None:
+				finished = sum(text is not None for text in texts)
+				job.progress.update(embed=self._build_progress_embed(job, " ".join(t for t in prefix if t), finished, len(texts)))
+
+		async def run(idx: int, parts: list[tuple[int, int]]):
+			if texts[idx] is not None:
+				return
+			with self.metrics.timer("stt_segment"):
+				texts[idx] = await self._transcribe_segment(job.stt_tier, [view[start:end] for start, end in parts], semaphore)
+			self.job_store.save_segment(job.id, idx, texts[idx])
+			report_progress()
+
+		await asyncio.gather(*(run(idx, parts) for idx, parts in enumerate(segments)))
+		return " ".join(text for text in texts if text)
 
+	async def _stage_download(self, job: TranscriptionJob) -> TranscriptionJob:
+		self.active_jobs[job.id] = job
+
+		job.start_time = time.perf_counter()  # ⏱️ start tracking
+		self.metrics.observe("queue_wait", job.start_time - job.enqueued_at)
+		print(f"Starting transcription for {job.canonical_url}")
+
+		# 🎚️ Jobs admitted with a tier keep it, resumed and deferred ones pick one now and warm it up while the audio downloads
+		if job.stt_tier not in self.stt_pools:
+			self._assign_tier(job)
+		else:
+			self._prewarm_stt(job.stt_tier)
+		self.metrics.incr(f"stt_tier.{job.stt_tier}")
+
+		# ♻️ Reuse converted audio from an earlier run of the same media
+		pcm_path = self.artifacts.get(job.source.id, job.clip_id, "pcm")
+		if pcm_path is not None:
+			self.metrics.incr("artifact_hits.pcm")
+			self._use_pcm(job, pcm_path)
+			self.job_store.update(job.id, stage="converted", pcm_path=pcm_path)
+			return job
+
+		# 🧱 Step 1: Download audio using yt_dlp via strategy (streaming also converts as it goes)
+		download_started = time.perf_counter()
+		if self._stream_audio and self._checkpoint_audio:
+			# 💾 Written to the checkpoint as it arrives and memory-mapped back, so memory doesn't grow with the media's length
+			tmp_path = self.artifacts.temp_path_for(job.source.id, job.clip_id, "pcm")
+			with self.metrics.timer("download"):  # includes the overlapped conversion and checkpoint
+				with open(tmp_path, "wb") as f:
+					written = await self._stream_audio_pcm(job, f)
+			pcm_path = self.artifacts.commit(job.source.id, job.clip_id, "pcm")
+			self._use_pcm(job, pcm_path)
+			job.duration = job.duration or written / Audio.BYTES_PER_SECOND
+			self.throughput.observe_download(job.duration, time.perf_counter() - download_started)
+			self.job_store.update(job.id, stage="converted", pcm_path=pcm_path)
+		elif self._stream_audio:
+			buffer = io.BytesIO()
+			with self.metrics.timer("download"):  # includes the overlapped conversion
+				await self._stream_audio_pcm(job, buffer)
+			job.pcm = buffer.getvalue()
+			job.duration = job.duration or len(job.pcm) / Audio.BYTES_PER_SECOND
+			self.throughput.observe_download(job.duration, time.perf_counter() - download_started)
+		else:
+			with self.metrics.timer("download"):
+				job.audio_path = await self._download_audio(job)
+			if job.duration:
+				self.throughput.observe_download(job.duration, time.perf_counter() - download_started)
+			self.job_store.update(job.id, stage="downloaded", audio_path=job.audio_path)
+		self._observe_format_savings(job)
+		return job
+
+	async def _stage_convert(self, job: TranscriptionJob) -> TranscriptionJob:
+		# 🎧 Step 2: Convert to mono 16 kHz WAV (Whisper-friendly)
+		if job.pcm is None:
+			with self.metrics.timer("convert"):
+				pcm_path = await self._convert_audio(job, job.audio_path)
+			self._use_pcm(job, pcm_path)
+			self.job_store.update(job.id, stage="converted", pcm_path=pcm_path)
+			self._release_audio(job)
+		return job
+
+	async def _stage_transcribe(self, job: TranscriptionJob) -> TranscriptionJob:
+		# Ensure STT backend is up before we send audio
+		with self.metrics.timer("stt_startup"):
+			await self._ensure_stt_running(job.stt_tier)
+
+		# 🎙️ Steps 3 & 4: Split at silences, upload and transcribe segments in parallel
+		job.marks["stt_started"] = time.perf_counter()
+		with self.metrics.timer("stt"):
+			job.transcript = await self._transcribe_pcm(job)
+		job.marks["stt_done"] = time.perf_counter()
+		media_seconds = len(job.pcm) / Audio.BYTES_PER_SECOND
+		job.duration = job.duration or media_seconds
+		self.throughput.observe_stt(media_seconds, job.marks["stt_done"] - job.marks["stt_started"])
+		self._release_pcm(job)
+		self.job_store.update(job.id, stage="transcribed", transcript=job.transcript)
+		return job
+
+	async def _stage_deliver(self, job: TranscriptionJob) -> None:
 		# 🕒 Step 5: Compute total time taken
-		elapsed = time.perf_counter() - start_time
+		elapsed = time.perf_counter() - job.start_time
 		mins, secs = divmod(int(elapsed), 60)
 		elapsed_str = f"{mins}m {secs}s" if mins else f"{secs}s"
 
-		# 🗒️ Step 6: Save transcript
-		os.makedirs("transcripts", exist_ok=True)
-		file_path = f"./transcripts/{job.media_id}.txt"
-		with open(file_path, "w", encoding="utf-8") as f:
-			f.write(transcript)
+		# 🔇 The VAD found no speech: say so rather than sending (and caching) an empty transcript
+		if not job.transcript.strip():
+			await self._deliver_no_speech(job)
+			return
 
-		# ✅ Step 7: Send result
+		# 🗒️ Step 6: Save transcript to the cache
+		file_path = self.transcript_cache.put(self._cache_key(job, job.stt_tier), job.transcript, {
+			"source": job.source.id,
+			"media_id": job.clip_id,
+			"model": self._stt_tiers[job.stt_tier]["model"],
+			"prompt": self._stt_config["prompt"],
+			"beam_size": self._stt_tiers[job.stt_tier]["beam_size"]
+		})
+
+		# ✅ Step 7: Show the full text in the progress message, then send the result with the file
+		if job.progress is not None:
+			await job.progress.finish(embed=self._build_progress_embed(job, job.transcript, 1, 1, title="✅ Transcribed"))
+		try:
+			with self.metrics.timer("delivery"):
+				for channel, mentions in job.channel_mentions():
+					await channel.send(**self._build_result_message(job, job.transcript, elapsed_str, file_path, mentions=mentions))
+				await self._batch_items_done(job, transcript=job.transcript)
+			self.metrics.observe("total", time.perf_counter() - job.enqueued_at)
+			self.metrics.incr("jobs_completed")
+		finally:
+			self.active_jobs.pop(job.id, None)
+			self._forget_inflight(job)
+			self.job_store.remove(job.id)
+		print(f"Finished transcription for {job.canonical_url} in {elapsed_str}")
+
+	async def _deliver_no_speech(self, job: TranscriptionJob):
 		embed = self.build_embed(
-			title="✅ Transcription Complete",
-			color=discord.Color.green(),
-			builder_fn=lambda e: [
+			"🔇 No Speech Detected",
+			discord.Color.greyple(),
+			lambda e: [
 				e.add_field(name="Source", value=f"[Open source]({job.canonical_url})", inline=False),
-				e.add_field(name="Time Taken", value=elapsed_str, inline=True),
-				e.set_thumbnail(url=job.thumbnail_url) if job.thumbnail_url else None
+				e.add_field(name="Status", value="Winston couldn't hear anyone speaking in this media, so there's no transcript.", inline=False)
 			]
 		)
+		if job.progress is not None:
+			await job.progress.finish(embed=embed)
+		try:
+			with self.metrics.timer("delivery"):
+				for channel, mentions in job.channel_mentions():
+					await channel.send(content=mentions, embed=embed)
+				await self._batch_items_done(job, error="No Speech Detected")
+			self.metrics.incr("no_speech")
+			self.metrics.incr("jobs_completed")
+		finally:
+			self.active_jobs.pop(job.id, None)
+			self._forget_inflight(job)
+			self.job_store.remove(job.id)
+		print(f"No speech detected in {job.canonical_url}")
+
+	async def _stage_remote(self, job: TranscriptionJob) -> TranscriptionJob | None:
+		"""Bot mode: hand the job to a worker through the broker and wait for the transcript."""
+		self.active_jobs[job.id] = job
+		job.start_time = time.perf_counter()
+		self.metrics.observe("queue_wait", job.start_time - job.enqueued_at)
+
+		# 📨 Keyed by the job id, so after a restart this re-attaches to the task already in the broker
+		job.task_id = self.broker.submit(self._job_payload(job), key=str(job.id))
+		future = asyncio.get_running_loop().create_future()
+		self._remote_jobs[job.task_id] = (job, future)
+		try:
+			with self.metrics.timer("remote"):
+				result = await future
+		finally:
+			self._remote_jobs.pop(job.task_id, None)
+		if result is None:
+			return None  # cancelled before a worker picked it up
+
+		status, outcome = result
+		if status == "failed":
+			self.broker.acknowledge(job.task_id)
+			raise PipelineError(outcome["title"], outcome["message"], f"{outcome.get('stage', 'worker')}: {outcome.get('detail', '')}")
+
+		job.transcript, job.stt_tier = outcome["transcript"], outcome["stt_tier"]
+		job.duration = job.duration or outcome["duration"]
+		self.throughput.observe_stt(job.duration, outcome["stt_seconds"])
+		self.job_store.update(job.id, stage="transcribed", transcript=job.transcript, stt_tier=job.stt_tier)
+		self.broker.acknowledge(job.task_id)
+		return job
+
+	async def _stage_report(self, job: TranscriptionJob) -> None:
+		"""Worker mode: send the transcript back to the bot through the broker."""
+		elapsed = time.perf_counter() - job.start_time
+		if job.progress is not None:
+			job.progress.close()  # the bot shows the full transcript itself
+		try:
+			self.broker.complete(job.task_id, self.worker_id, {
+				"transcript": job.transcript,
+				"stt_tier": job.stt_tier,
+				"duration": job.duration,
+				"stt_seconds": job.marks["stt_done"] - job.marks["stt_started"],
+			})
+			self.metrics.incr("jobs_completed")
+		finally:
+			self.leased_jobs.pop(job.task_id, None)
+			self.active_jobs.pop(job.id, None)
+			self.job_store.remove(job.id)
+		print(f"Finished transcription for {job.canonical_url} in {elapsed:.1f}s")
+
+	def _forget_inflight(self, job: TranscriptionJob):
+		"""Stop coalescing onto a job, unless another job has taken its key since (eg. after a tier fallback)."""
+		if self._inflight.get(job.inflight_key) is job:
+			del self._inflight[job.inflight_key]
+
+	def _discard_job(self, job: TranscriptionJob):
+		"""Drop all bookkeeping for a job that won't complete."""
+		self._release_audio(job)
+		self._release_pcm(job)
+		if job.progress is not None:
+			job.progress.close()
+		self.active_jobs.pop(job.id, None)
+		self._forget_inflight(job)
+		self.job_store.remove(job.id)
+
+	async def _on_job_failed(self, job: TranscriptionJob, stage: Stage, err: Exception):
+		self._discard_job(job)
+		self.metrics.incr("jobs_failed")
+		self.metrics.incr(f"failures.{stage.name}")
+		if stage.name == "deliver":
+			print(f"Failed to deliver transcript for {job.canonical_url}: {err}")
+			await self._batch_items_done(job, error="Delivery Failed")
+			return
+		await self._notify_failure(job, err)
 
-		if len(transcript) <= 1000:
-			embed.add_field(name="Transcript", value=transcript, inline=False)
-			await job.interaction.channel.send(
-				content=f"{job.interaction.user.mention} The transcript is ready.",
-				embed=embed
-			)
+	async def _notify_failure(self, job: TranscriptionJob, err: Exception):
+		if isinstance(err, PipelineError):
+			print(f"{err.title}:\n{err.detail}")
+			title, message = err.title, err.message
 		else:
-			file = discord.File(file_path, filename=f"{job.media_id}.txt")
-			await job.interaction.channel.send(
-				content=f"{job.interaction.user.mention} Here's the transcript file.",
-				embed=embed,
-				file=file
-			)
+			print(f"Transcription failed: {err}")
+			title, message = "Transcription Failed", f"```\n{err}\n```"
 
-		self.active_jobs.remove(job)
-		print(f"Finished transcription for {job.canonical_url} in {elapsed_str}")
+		embed = self.build_embed(
+			f"❌ {title}",
+			discord.Color.red(),
+			lambda e: e.add_field(name="Error", value=message)
+		)
+		for channel, mentions in job.channel_mentions():
+			await channel.send(content=mentions if job.followers else None, embed=embed)
+		await self._batch_items_done(job, error=title)
+
+	async def _report_failure(self, job: TranscriptionJob, stage: Stage, err: Exception):
+		"""Worker mode: the bot tells the user, the worker only records why."""
+		self._discard_job(job)
+		self.leased_jobs.pop(job.task_id, None)
+		self.metrics.incr("jobs_failed")
+		self.metrics.incr(f"failures.{stage.name}")
+		if isinstance(err, PipelineError):
+			outcome = {"title": err.title, "message": err.message, "detail": err.detail}
+		else:
+			outcome = {"title": "Transcription Failed", "message": f"```\n{err}\n```", "detail": str(err)}
+		print(f"{outcome['title']}:\n{outcome['detail']}")
+		self.broker.fail(job.task_id, self.worker_id, {**outcome, "stage": stage.name})
+
+	def _job_payload(self, job: TranscriptionJob) -> dict:
+		"""Everything a worker needs to run the job, as sent through the broker."""
+		return {
+			**job.to_record(),
+			"stt_tier": job.stt_tier,
+			"duration": job.duration,
+			"eta": job.eta,
+			"metadata": vars(job.metadata) if job.metadata is not None else None,
+		}
 
-	@tasks.loop(seconds=30)
-	async def stt_idle_task(self):
-		"""
-		Periodically check if the STT server has been idle long enough
-		and shut it down if so.
-		"""
-		if self.stt is None:
-			return
-		if self._stt_busy:
+	def _job_from_payload(self, payload: dict) -> TranscriptionJob | None:
+		source = next((s for s in self.sources if s.id == payload["source_id"]), None)
+		if source is None:
+			return None
+
+		job = TranscriptionJob(
+			None,
+			source,
+			payload["media_id"],
+			payload["canonical_url"],
+			payload["thumbnail_url"],
+			channel=discord.Object(id=payload["channel_id"]),  # only the bot talks to Discord
+			user_id=payload["user_id"]
+		)
+		job.clip_start, job.clip_end = payload["clip_start"], payload["clip_end"]
+		job.quality, job.stt_tier = payload["quality"], payload["stt_tier"]
+		job.duration, job.eta = payload["duration"], payload["eta"]
+		if payload["metadata"] is not None:
+			job.metadata = MediaMetadata(**payload["metadata"])
+		job.id = self.job_store.add(job.to_record())
+		return job
+
+	async def _restore_job(self, row, sources: dict[str, MediaSourceStrategy]) -> TranscriptionJob | None:
+		source = sources.get(row["source_id"])
+		if source is None:
+			return None
+		try:
+			channel = self.bot.get_channel(row["channel_id"]) or await self.bot.fetch_channel(row["channel_id"])
+		except discord.DiscordException:
+			return None
+
+		job = TranscriptionJob(
+			None,
+			source,
+			row["media_id"],
+			row["canonical_url"],
+			row["thumbnail_url"],
+			channel=channel,
+			user_id=row["user_id"]
+		)
+		job.id = row["id"]
+		job.clip_start, job.clip_end = row["clip_start"], row["clip_end"]
+		job.quality, job.stt_tier = row["quality"], row["stt_tier"]
+		# Rows from before tiers existed have none, and a tier's model may have been removed since.
+		# A finished transcript only needs its tier's settings, anything still to transcribe needs a running pool
+		# (the bot leaves that to its workers, queued jobs pick a tier again on download)
+		if row["stage"] == "transcribed":
+			usable = job.stt_tier in self._stt_tiers
+		else:
+			usable = job.stt_tier in self.stt_pools or self.mode == "bot" or row["stage"] == "queued"
+		if not usable:
+			job.stt_tier = self._stt_default_tier
+		return job
+
+	async def _resume_jobs(self):
+		"""Re-queue jobs left unfinished by the last run, each from the last stage it completed."""
+		await self.bot.wait_until_ready()
+		sources = {s.id: s for s in self.sources}
+
+		for row in self.job_store.unfinished():
+			try:
+				await self._resume_job(row, sources)
+			except Exception as e:
+				# One bad row mustn't stop the rest from resuming
+				print(f"Failed to resume job for {row['canonical_url']}, dropping it: {e}")
+				for job in [j for j in self._inflight.values() if j.id == row["id"]]:
+					self._discard_job(job)
+				self.job_store.remove(row["id"])
+
+	async def _resume_job(self, row, sources: dict[str, MediaSourceStrategy]):
+		job = await self._restore_job(row, sources)
+		if job is None:
+			print(f"Dropping unresumable job for {row['canonical_url']}")
+			self.job_store.remove(row["id"])
 			return
-		if self._stt_last_used is None:
+		for follower_row in self.job_store.followers(row["id"]):
+			follower = await self._restore_job(follower_row, sources)
+			if follower is not None:
+				job.followers.append(follower)
+		self._inflight[job.inflight_key] = job
+
+		stage = row["stage"]
+		print(f"Resuming job for {job.canonical_url} from stage '{stage}'")
+		if stage == "transcribed":
+			job.transcript = row["transcript"]
+			target = "deliver"
+		elif self.mode == "bot":
+			# The bot has no convert/transcribe stages, a job left part way by a local run goes to a worker from the start
+			await self.pipeline.put(job)
 			return
-
-		now = time.perf_counter()
-		if now - self._stt_last_used < self._stt_idle_timeout:
+		elif stage == "converted" and row["pcm_path"] and os.path.exists(row["pcm_path"]):
+			self._use_pcm(job, row["pcm_path"])
+			target = "transcribe"
+		elif stage == "downloaded" and row["audio_path"] and os.path.exists(row["audio_path"]):
+			job.audio_path = row["audio_path"]
+			self.artifacts.pin(job.audio_path)
+			target = "convert"
+		else:
+			await self.pipeline.put(job)
 			return
 
-		async with self._stt_lock:
-			# Re-check inside the lock for safety
-			if self.stt is None or self._stt_busy:
-				return
-
-			print("Shutting down STT server due to inactivity...")
-			self.stt.close()
-			self.stt = None
-			self._stt_last_used = None
+		job.start_time = time.perf_counter()
+		self.active_jobs[job.id] = job
+		await self.pipeline.put(job, target)
+
+	@tasks.loop(seconds=10)
+	async def admission_task(self):
+		"""Let deferred jobs in once the backlog is back under the threshold."""
+		await self._release_deferred()
+
+	async def _release_deferred(self):
+		"""Release deferred jobs into the pipeline, oldest first, while the backlog is under the threshold."""
+		while self.deferred_jobs and self._backlog_seconds() <= self._max_backlog_seconds:
+			job = self.deferred_jobs.popleft()
+			self._estimate_times(job, self._backlog_seconds())
+			if job.progress is not None:
+				job.progress.update(embed=self._build_progress_embed(job, "", 0, 0))
+			await self.pipeline.put(job)
+
+	def _estimate_times(self, job: TranscriptionJob, backlog: float):
+		"""When the job should reach STT and finish, shown while it waits."""
+		start_in, finish_in = self.throughput.estimate(backlog, job.duration)
+		now = time.time()
+		job.starts_at, job.eta = now + start_in, now + finish_in
+
+	@tasks.loop(seconds=2)
+	async def broker_task(self):
+		"""Bot mode: relay worker progress and results. Worker mode: heartbeat and lease new jobs."""
+		try:
+			if self.mode == "bot":
+				await self._poll_broker()
+			else:
+				await self._serve_broker()
+		except sqlite3.Error as e:
+			# Eg. the broker stayed locked past the busy timeout, try again next tick
+			print(f"Broker unavailable: {e}")
+
+	async def _poll_broker(self):
+		for row in self.broker.poll(list(self._remote_jobs)):
+			job, future = self._remote_jobs[row["id"]]
+			if row["status"] in ("done", "failed"):
+				if not future.done():
+					future.set_result((row["status"], json.loads(row["result"])))
+				continue
+			embed = json.loads(row["progress"])["embed"]
+			if embed is not None and job.progress is not None:
+				job.progress.update(embed=self._brand_embed(discord.Embed.from_dict(embed)))
+
+	async def _serve_broker(self):
+		# 💓 Keep our leases alive. A lost lease (expired while we were stalled) has been requeued,
+		# its job is dropped if it hasn't started, a running one finishes but its result is ignored
+		for task_id in self.broker.heartbeat(self.worker_id, list(self.leased_jobs), self._worker_capacity):
+			job = self.leased_jobs.pop(task_id)
+			print(f"Lost the lease on {job.canonical_url}")
+			if self.scheduler.cancel(job):
+				self._discard_job(job)
+
+		# 📈 Learn from every request the bot queued, not only the ones this worker leases
+		for arrived in self.broker.arrivals_since(self._arrivals_seen):
+			self.keep_alive.observe(arrived)
+			self._arrivals_seen = arrived
+
+		# 📥 Lease new jobs up to capacity
+		while len(self.leased_jobs) < self._worker_capacity:
+			leased = self.broker.lease(self.worker_id)
+			if leased is None:
+				break
+			task_id, payload = leased
+			job = self._job_from_payload(payload)
+			if job is None:
+				self.broker.fail(task_id, self.worker_id, {
+					"title": "Unsupported Source",
+					"message": "No worker can handle this link.",
+					"detail": f"unknown source {payload['source_id']}",
+				})
+				continue
+			job.task_id = task_id
+			job.progress = ProgressMessage(BrokerMessage(self.broker, task_id, self.worker_id), self._progress_interval)
+			self.leased_jobs[task_id] = job
+			print(f"Leased job for {job.canonical_url}")
+			await self.pipeline.put(job)
+
+	@tasks.loop(seconds=15)
+	async def metrics_task(self):
+		"""Periodically dump the metrics snapshot as JSON."""
+		self.metrics.write(self._metrics_path)
+
+	async def cog_load(self):
+		self._resume_task = asyncio.create_task(self._resume_jobs())
 
-	def cog_unload(self):
-		self.worker.cancel()
+	@tasks.loop(seconds=30)
+	async def stt_idle_task(self):
+		"""
+		Periodically shut down any STT server in the pool that has been idle longer than the
+		keep-alive policy's timeout (or the fixed one), and pre-start one when a request looks likely.
+		"""
+		now = time.time()
+		timeout = self.keep_alive.idle_timeout(now) if self._stt_adaptive_keep_alive else self._stt_idle_timeout
+		# A server that would only be pre-started again is left running
+		prestart = self._stt_adaptive_keep_alive and self.mode != "bot" and self.keep_alive.should_prestart(now)
+		if not prestart:
+			for tier, pool in self.stt_pools.items():
+				# Jobs already picked this tier and are still queued, downloading or converting, its servers are needed soon
+				if self._tier_load(tier) > 0 or any(job.stt_tier == tier for job in self.scheduler):
+					continue
+				for idle, rss in await pool.reap_idle(timeout):
+					self.metrics.incr("stt_shutdowns")
+					if not self._stt_adaptive_keep_alive:
+						continue
+					size = self._stt_resident_bytes(tier, rss)
+					if idle < self._stt_idle_timeout:
+						self._stt_early_shutdowns.append((tier, now, now + self._stt_idle_timeout - idle, size))
+					else:
+						self._count_memory_saved(size, self._stt_idle_timeout - idle)
+		self._settle_early_shutdowns(now)
+
+		# 🔥 Nothing running but a request is likely soon, pay the model load now instead of on the request
+		idle_backend = not any(len(pool) for pool in self.stt_pools.values())
+		if prestart and idle_backend:
+			print("Pre-starting an STT server, a request is likely soon")
+			self.metrics.incr("stt_prestarts")
+			self._prewarm_stt(self._stt_default_tier)
+		self.keep_alive.save()
+
+	async def cog_unload(self):
+		if self._resume_task is not None:
+			self._resume_task.cancel()
+		await self.pipeline.stop()
 		self.stt_idle_task.cancel()
-		if self.stt is not None:
-			self.stt.close()
+		self.metrics_task.cancel()
+		self.fetcher.close()
+		self.admission_task.cancel()
+		if self.broker is not None:
+			self.broker_task.cancel()
+			# Hand unfinished work back so another worker picks it up straight away
+			for task_id in self.leased_jobs:
+				self.broker.release(task_id, self.worker_id)
+			if self.mode == "worker":
+				self.broker.unregister(self.worker_id)
+			self.broker.close()
+		self.keep_alive.save()
+		self.metrics.write(self._metrics_path)
+		await asyncio.gather(*(pool.close() for pool in self.stt_pools.values()))
+		self.job_store.close()
 
 
 async def setup(bot: commands.Bot):
-	await bot.add_cog(WinstonCog(bot))
\ No newline at end of file
+	await bot.add_cog(WinstonCog(bot, mode=os.getenv("WINSTON_MODE", "local")))
\ No newline at end of file
@@ -1,4 +1,4 @@
 @echo off
 python -m venv venv
 call venv\Scripts\activate
-pip install aiohttp discord python-dotenv, requests
\ No newline at end of file
+pip install aiohttp discord python-dotenv numpy yt-dlp
\ No newline at end of file
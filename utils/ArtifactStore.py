@@ -0,0 +1,118 @@
+import os, json, time, threading
+from pathlib import Path
+
+class ArtifactStore:
+	"""
+	Media files (downloaded audio, converted PCM) tracked by (source id, media id, format)
+	so retries and repeat requests can reuse them.
+	The directory is kept under max_bytes by evicting the least recently used files,
+	files pinned by running jobs are never evicted. Writes go to a temp file and are renamed into place.
+	"""
+	def __init__(self, root: str, max_bytes: int = 10 * 1024 ** 3):
+		self.root = root
+		self.max_bytes = max_bytes
+		self._index_path = os.path.join(root, "index.json")
+		self._lock = threading.Lock()
+		self._pins: dict[str, int] = {}
+
+		Path(root).mkdir(parents=True, exist_ok=True)
+		self._index: dict[str, dict] = self._load_index()
+
+	def _load_index(self) -> dict[str, dict]:
+		try:
+			with open(self._index_path, "r", encoding="utf-8") as f:
+				index = json.load(f)
+		except (FileNotFoundError, json.JSONDecodeError):
+			index = {}
+
+		# Adopt untracked files (eg. left by older versions) so they count towards the budget,
+		# and forget entries whose file has gone
+		files = {}
+		for entry in os.scandir(self.root):
+			if not entry.is_file() or entry.name == "index.json" or entry.name.endswith(".tmp"):
+				continue
+			stat = entry.stat()
+			files[entry.name] = index.get(entry.name) or {"size": stat.st_size, "last_access": stat.st_mtime}
+		return files
+
+	def _save_index(self):
+		tmp_path = self._index_path + ".tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self._index, f)
+		os.replace(tmp_path, self._index_path)
+
+	@staticmethod
+	def _name(source_id: str, media_id: str, fmt: str) -> str:
+		return f"{source_id}_{media_id}.{fmt}"
+
+	def path_for(self, source_id: str, media_id: str, fmt: str) -> str:
+		return os.path.join(self.root, self._name(source_id, media_id, fmt))
+
+	def temp_path_for(self, source_id: str, media_id: str, fmt: str) -> str:
+		"""Where to write a new artifact before commit() moves it into place."""
+		return self.path_for(source_id, media_id, fmt) + ".tmp"
+
+	def get(self, source_id: str, media_id: str, fmt: str) -> str | None:
+		"""Path of a stored artifact (marking it recently used), or None."""
+		name = self._name(source_id, media_id, fmt)
+		with self._lock:
+			entry = self._index.get(name)
+			path = os.path.join(self.root, name)
+			if entry is None or not os.path.exists(path):
+				self._index.pop(name, None)
+				return None
+			entry["last_access"] = time.time()
+			self._save_index()
+			return path
+
+	def commit(self, source_id: str, media_id: str, fmt: str, written_path: str | None = None) -> str:
+		"""
+		Register a finished artifact and return its final path.
+		written_path (default the temp path) is atomically renamed into place, pass the final path
+		itself for tools that manage their own partial files.
+		"""
+		name = self._name(source_id, media_id, fmt)
+		path = os.path.join(self.root, name)
+		written_path = written_path or self.temp_path_for(source_id, media_id, fmt)
+		if written_path != path:
+			os.replace(written_path, path)
+
+		with self._lock:
+			self._index[name] = {"size": os.path.getsize(path), "last_access": time.time()}
+			self._evict()
+			self._save_index()
+		return path
+
+	def pin(self, path: str):
+		"""Protect an artifact from eviction while a job uses it."""
+		name = os.path.basename(path)
+		with self._lock:
+			self._pins[name] = self._pins.get(name, 0) + 1
+
+	def unpin(self, path: str):
+		name = os.path.basename(path)
+		with self._lock:
+			count = self._pins.get(name, 0) - 1
+			if count > 0:
+				self._pins[name] = count
+			else:
+				self._pins.pop(name, None)
+
+	def _evict(self):
+		total = sum(entry["size"] for entry in self._index.values())
+		if total <= self.max_bytes:
+			return
+		for name, entry in sorted(self._index.items(), key=lambda kv: kv[1]["last_access"]):
+			if total <= self.max_bytes:
+				break
+			if name in self._pins:
+				continue
+			try:
+				os.remove(os.path.join(self.root, name))
+			except FileNotFoundError:
+				pass
+			except PermissionError:
+				# Still memory-mapped somewhere (Windows), try again next time
+				continue
+			total -= entry["size"]
+			del self._index[name]
@@ -0,0 +1,153 @@
+import numpy as np
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2  # 16-bit mono
+FRAME_SECONDS = 0.03  # 30 ms analysis frames
+
+def _frame_rms(samples: np.ndarray, frame: int, chunk_frames: int = 4096) -> np.ndarray:
+	"""RMS energy of each whole frame of int16 samples, as float32. Converted a chunk at a time, not the whole buffer."""
+	n_frames = len(samples) // frame
+	rms = np.empty(n_frames, dtype=np.float32)
+	for first in range(0, n_frames, chunk_frames):
+		last = min(n_frames, first + chunk_frames)
+		frames = samples[first * frame:last * frame].reshape(last - first, frame).astype(np.float32)
+		rms[first:last] = np.sqrt(np.mean(frames * frames, axis=1))
+	return rms
+
+def split_on_silence(
+	pcm: bytes,
+	max_segment_seconds: float = 120,
+	min_segment_seconds: float = 30,
+	smoothing_seconds: float = 0.3,
+	sample_rate: int = SAMPLE_RATE,
+	first_segment_seconds: float | None = None,
+) -> list[tuple[int, int]]:
+	"""
+	Split 16-bit mono PCM into segments no longer than max_segment_seconds.
+	Each cut is placed at the quietest point (smoothed RMS) between min and max segment length,
+	so words are rarely split in half.
+	first_segment_seconds optionally caps the first segment lower, so the first text arrives sooner.
+	Returns (start, end) byte offsets into pcm.
+	"""
+	samples = np.frombuffer(pcm, dtype=np.int16)
+	total = len(samples)
+	max_len = int(max_segment_seconds * sample_rate)
+	if total <= max_len:
+		return [(0, len(pcm))]
+
+	frame = int(FRAME_SECONDS * sample_rate)
+	rms = _frame_rms(samples, frame)
+	width = max(1, int(smoothing_seconds / FRAME_SECONDS))
+	smoothed = np.convolve(rms, np.ones(width, dtype=np.float32) / width, mode="same")
+
+	min_frames = int(min_segment_seconds * sample_rate) // frame
+	max_frames = max_len // frame
+
+	segments = []
+	start = 0  # in frames
+	while (total - start * frame) > max_len:
+		low, high = min_frames, max_frames
+		if not segments and first_segment_seconds:
+			high = max(1, min(max_frames, int(first_segment_seconds * sample_rate) // frame))
+			low = min(low, high // 2)
+		window = smoothed[start + low:start + high]
+		cut = start + low + int(np.argmin(window))
+		segments.append((start * frame * 2, cut * frame * 2))
+		start = cut
+	segments.append((start * frame * 2, len(pcm)))
+	return segments
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+	"""[start, end) frame indices of each run of True in mask, shape (n, 2)."""
+	edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+	return edges.reshape(-1, 2)
+
+def detect_speech(
+	pcm: bytes,
+	sample_rate: int = SAMPLE_RATE,
+	margin_db: float = 12.0,
+	min_level_db: float = -55.0,
+	pad_seconds: float = 0.3,
+	min_silence_seconds: float = 1.0,
+	min_speech_seconds: float = 0.2,
+) -> list[tuple[int, int]]:
+	"""
+	Energy based voice activity detection over 16-bit mono PCM.
+	A frame is active when it is margin_db above the noise floor (10th percentile level), capped so
+	continuous speech doesn't raise the bar above itself, and never below min_level_db (dBFS).
+	Active runs shorter than min_speech_seconds are dropped as clicks, the rest are padded and merged
+	unless the gap between them is at least min_silence_seconds.
+	Returns (start, end) byte offsets of the regions to keep.
+	"""
+	samples = np.frombuffer(pcm, dtype=np.int16)
+	frame = int(FRAME_SECONDS * sample_rate)
+	rms = _frame_rms(samples, frame)
+	if len(rms) == 0:
+		return [(0, len(pcm))] if len(pcm) else []
+
+	level = 20 * np.log10(np.maximum(rms, 1.0) / 32768)
+	floor, loud = np.percentile(level, [10, 90])
+	threshold = max(min_level_db, min(floor + margin_db, loud - 25))
+	runs = _runs(level > threshold)
+
+	runs = runs[(runs[:, 1] - runs[:, 0]) >= int(min_speech_seconds / FRAME_SECONDS)]
+	if len(runs) == 0:
+		return []
+	pad = int(pad_seconds / FRAME_SECONDS)
+	runs[:, 0] = np.maximum(runs[:, 0] - pad, 0)
+	runs[:, 1] = np.minimum(runs[:, 1] + pad, len(rms))
+
+	breaks = (runs[1:, 0] - runs[:-1, 1]) >= int(min_silence_seconds / FRAME_SECONDS)
+	starts = runs[np.concatenate(([True], breaks)), 0]
+	ends = runs[np.concatenate((breaks, [True])), 1]
+
+	regions = [(int(start) * frame * 2, int(end) * frame * 2) for start, end in zip(starts, ends)]
+	if ends[-1] == len(rms):
+		regions[-1] = (regions[-1][0], len(pcm))  # keep the partial frame at the end
+	return regions
+
+def speech_segments(
+	pcm: bytes,
+	regions: list[tuple[int, int]],
+	max_segment_seconds: float = 120,
+	min_segment_seconds: float = 30,
+	sample_rate: int = SAMPLE_RATE,
+	first_segment_seconds: float | None = None,
+) -> list[list[tuple[int, int]]]:
+	"""
+	Group speech regions (from detect_speech) into segments of at most max_segment_seconds of speech,
+	regions too long for one segment are cut with split_on_silence.
+	Each segment is a list of (start, end) byte ranges of pcm, uploaded back to back, so the speech
+	never has to be copied out of the original buffer.
+	"""
+	bytes_per_second = sample_rate * 2
+	total = sum(end - start for start, end in regions)
+	first_cap = first_segment_seconds if total > max_segment_seconds * bytes_per_second else None
+
+	view = memoryview(pcm)
+	pieces = []
+	for start, end in regions:
+		cuts = split_on_silence(
+			view[start:end],
+			max_segment_seconds=max_segment_seconds,
+			min_segment_seconds=min_segment_seconds,
+			sample_rate=sample_rate,
+			first_segment_seconds=None if pieces else first_cap,
+		)
+		pieces += [(start + cut_start, start + cut_end) for cut_start, cut_end in cuts]
+
+	segments: list[list[tuple[int, int]]] = []
+	current, size = [], 0
+	for start, end in pieces:
+		limit = (first_cap if not segments and first_cap else max_segment_seconds) * bytes_per_second
+		if current and size + (end - start) > limit:
+			segments.append(current)
+			current, size = [], 0
+		if current and current[-1][1] == start:
+			current[-1] = (current[-1][0], end)  # pieces of one split region are contiguous
+		else:
+			current.append((start, end))
+		size += end - start
+	if current:
+		segments.append(current)
+	return segments
@@ -0,0 +1,191 @@
+import json, sqlite3, time
+from pathlib import Path
+
+class JobBroker:
+	"""
+	SQLite (WAL mode) task queue between the bot and standalone workers.
+	Workers lease tasks, keep the leases alive with heartbeats and report progress and results.
+	A task whose lease runs out (its worker died) goes back to the queue, at most max_attempts times.
+	Submitting with a key that is already queued or running returns the existing task instead of a new one.
+	Single host only: WAL's shared-memory index doesn't work over a network filesystem.
+	"""
+	def __init__(self, path: str, lease_seconds: float = 60, max_attempts: int = 3):
+		Path(path).parent.mkdir(parents=True, exist_ok=True)
+		self.lease_seconds = lease_seconds
+		self.max_attempts = max_attempts
+		self.conn = sqlite3.connect(path, isolation_level=None, timeout=30)  # autocommit, wait on other processes' locks
+		self.conn.row_factory = sqlite3.Row
+		self.conn.execute("PRAGMA journal_mode=WAL")
+		self.conn.execute("PRAGMA synchronous=NORMAL")
+		self.conn.executescript("""
+			CREATE TABLE IF NOT EXISTS tasks (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				key TEXT UNIQUE,
+				payload TEXT NOT NULL,
+				status TEXT NOT NULL DEFAULT 'queued',
+				worker TEXT,
+				lease_expires REAL,
+				attempts INTEGER NOT NULL DEFAULT 0,
+				progress TEXT,
+				result TEXT,
+				created REAL NOT NULL,
+				updated REAL NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+			CREATE TABLE IF NOT EXISTS workers (
+				id TEXT PRIMARY KEY,
+				capacity INTEGER NOT NULL,
+				last_seen REAL NOT NULL
+			);
+			CREATE TABLE IF NOT EXISTS arrivals (at REAL NOT NULL);
+			CREATE INDEX IF NOT EXISTS arrivals_at ON arrivals (at);
+		""")
+
+	@staticmethod
+	def _placeholders(values) -> str:
+		return ", ".join("?" * len(values))
+
+	# ── Bot side ──
+	def submit(self, payload: dict, key: str | None = None) -> int:
+		if key is not None:
+			row = self.conn.execute("SELECT id FROM tasks WHERE key = ?", (key,)).fetchone()
+			if row is not None:
+				return row["id"]
+		now = time.time()
+		cursor = self.conn.execute(
+			"INSERT INTO tasks (key, payload, created, updated) VALUES (?, ?, ?, ?)",
+			(key, json.dumps(payload), now, now)
+		)
+		return cursor.lastrowid
+
+	def cancel(self, task_id: int) -> bool:
+		"""Remove a task no worker has picked up yet."""
+		return self.conn.execute("DELETE FROM tasks WHERE id = ? AND status = 'queued'", (task_id,)).rowcount == 1
+
+	def poll(self, task_ids: list[int]) -> list[sqlite3.Row]:
+		"""Tasks among task_ids that have finished or have new progress, the progress is consumed."""
+		if not task_ids:
+			return []
+		rows = self.conn.execute(
+			f"SELECT id, status, progress, result FROM tasks WHERE id IN ({self._placeholders(task_ids)}) "
+			"AND (status IN ('done', 'failed') OR progress IS NOT NULL)",
+			task_ids
+		).fetchall()
+		for row in rows:
+			if row["progress"] is not None:
+				self.conn.execute("UPDATE tasks SET progress = NULL WHERE id = ? AND progress = ?", (row["id"], row["progress"]))
+		return rows
+
+	def acknowledge(self, task_id: int):
+		"""Forget a finished task once its result has been handled."""
+		self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+	def record_arrival(self, at: float, keep_seconds: float = 86400):
+		"""Note when a request was queued, so every worker's keep-alive learns from all of them."""
+		self.conn.execute("INSERT INTO arrivals (at) VALUES (?)", (at,))
+		self.conn.execute("DELETE FROM arrivals WHERE at < ?", (at - keep_seconds,))
+
+	def live_workers(self, within: float = 30) -> list[sqlite3.Row]:
+		"""Workers that have sent a heartbeat in the last `within` seconds, with their capacity."""
+		return self.conn.execute("SELECT id, capacity FROM workers WHERE last_seen > ?", (time.time() - within,)).fetchall()
+
+	# ── Worker side ──
+	def arrivals_since(self, since: float) -> list[float]:
+		"""Request arrival times after `since`, oldest first."""
+		return [row["at"] for row in self.conn.execute("SELECT at FROM arrivals WHERE at > ? ORDER BY at", (since,))]
+
+	def lease(self, worker_id: str) -> tuple[int, dict] | None:
+		"""Take the oldest queued task, or None if there isn't one."""
+		now = time.time()
+		self.conn.execute("BEGIN IMMEDIATE")  # serialises leasing between workers
+		try:
+			self._expire(now)
+			row = self.conn.execute("SELECT id, payload FROM tasks WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+			if row is not None:
+				self.conn.execute(
+					"UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+					(worker_id, now + self.lease_seconds, now, row["id"])
+				)
+			self.conn.execute("COMMIT")
+		except Exception:
+			self.conn.execute("ROLLBACK")
+			raise
+		return None if row is None else (row["id"], json.loads(row["payload"]))
+
+	def heartbeat(self, worker_id: str, task_ids: list[int], capacity: int) -> set[int]:
+		"""Extend the worker's leases, returns the task ids it no longer holds (cancelled or expired)."""
+		now = time.time()
+		self.conn.execute(
+			"INSERT INTO workers (id, capacity, last_seen) VALUES (?, ?, ?) "
+			"ON CONFLICT (id) DO UPDATE SET capacity = excluded.capacity, last_seen = excluded.last_seen",
+			(worker_id, capacity, now)
+		)
+		self.conn.execute(
+			"UPDATE tasks SET lease_expires = ? WHERE worker = ? AND status = 'leased'",
+			(now + self.lease_seconds, worker_id)
+		)
+		held = {row["id"] for row in self.conn.execute("SELECT id FROM tasks WHERE worker = ? AND status = 'leased'", (worker_id,))}
+		return set(task_ids) - held
+
+	def report_progress(self, task_id: int, worker_id: str, progress: dict):
+		self.conn.execute(
+			"UPDATE tasks SET progress = ?, updated = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+			(json.dumps(progress), time.time(), task_id, worker_id)
+		)
+
+	def complete(self, task_id: int, worker_id: str, result: dict) -> bool:
+		return self._finish(task_id, worker_id, "done", result)
+
+	def fail(self, task_id: int, worker_id: str, result: dict) -> bool:
+		return self._finish(task_id, worker_id, "failed", result)
+
+	def release(self, task_id: int, worker_id: str):
+		"""Hand a task back to the queue (eg. on shutdown) without using up an attempt."""
+		self.conn.execute(
+			"UPDATE tasks SET status = 'queued', worker = NULL, attempts = attempts - 1, updated = ? "
+			"WHERE id = ? AND worker = ? AND status = 'leased'",
+			(time.time(), task_id, worker_id)
+		)
+
+	def unregister(self, worker_id: str):
+		self.conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+	def _finish(self, task_id: int, worker_id: str, status: str, result: dict) -> bool:
+		# Only the current lease holder may finish it, a worker that lost its lease is ignored
+		cursor = self.conn.execute(
+			"UPDATE tasks SET status = ?, result = ?, progress = NULL, updated = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+			(status, json.dumps(result), time.time(), task_id, worker_id)
+		)
+		return cursor.rowcount == 1
+
+	def _expire(self, now: float):
+		for row in self.conn.execute("SELECT id, attempts FROM tasks WHERE status = 'leased' AND lease_expires < ?", (now,)).fetchall():
+			if row["attempts"] >= self.max_attempts:
+				result = {
+					"title": "Worker Lost",
+					"message": "The worker running this job stopped responding.",
+					"detail": f"lease expired after {row['attempts']} attempt(s)",
+				}
+				self.conn.execute(
+					"UPDATE tasks SET status = 'failed', result = ?, updated = ? WHERE id = ?",
+					(json.dumps(result), now, row["id"])
+				)
+			else:
+				self.conn.execute("UPDATE tasks SET status = 'queued', worker = NULL, updated = ? WHERE id = ?", (now, row["id"]))
+
+	def close(self):
+		self.conn.close()
+
+
+class BrokerMessage:
+	"""Stands in for the progress discord.Message on a worker, edits are forwarded through the broker."""
+	def __init__(self, broker: JobBroker, task_id: int, worker_id: str):
+		self.broker = broker
+		self.task_id = task_id
+		self.worker_id = worker_id
+
+	async def edit(self, embed=None, **kwargs):
+		try:
+			self.broker.report_progress(self.task_id, self.worker_id, {"embed": embed.to_dict() if embed else None})
+		except sqlite3.Error as e:
+			print(f"Failed to report progress to the broker: {e}")
@@ -11,4 +11,8 @@ class CogModule(commands.Cog):
 
 	def is_owner(self, interaction: discord.Interaction) -> bool:
 		"""Check if the user is the management list."""
-		return interaction.user.id in self.OWNER_IDS
\ No newline at end of file
+		return interaction.user.id in self.OWNER_IDS
+
+	async def send_unauthorised_message(self, interaction: discord.Interaction):
+		"""Tell a non-owner they can't use a management command."""
+		await interaction.response.send_message("You are not authorised to use this command.", ephemeral=True)
\ No newline at end of file
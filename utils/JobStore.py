@@ -0,0 +1,89 @@
+import sqlite3, time
+from pathlib import Path
+
+# Job stages in the order they are reached, a job resumes from the last one it recorded
+STAGES = ("queued", "downloaded", "converted", "transcribed")
+
+class JobStore:
+	"""
+	SQLite (WAL mode) record of unfinished transcription jobs and their artifacts,
+	so queued and partially completed work survives a restart.
+	Rows are deleted once a job is delivered or has failed.
+	"""
+	def __init__(self, path: str):
+		Path(path).parent.mkdir(parents=True, exist_ok=True)
+		self.conn = sqlite3.connect(path, isolation_level=None)  # autocommit
+		self.conn.row_factory = sqlite3.Row
+		self.conn.execute("PRAGMA journal_mode=WAL")
+		self.conn.execute("PRAGMA synchronous=NORMAL")
+		self.conn.execute("PRAGMA foreign_keys=ON")
+		self.conn.executescript("""
+			CREATE TABLE IF NOT EXISTS jobs (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				leader_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
+				source_id TEXT NOT NULL,
+				media_id TEXT NOT NULL,
+				canonical_url TEXT NOT NULL,
+				thumbnail_url TEXT,
+				channel_id INTEGER NOT NULL,
+				user_id INTEGER NOT NULL,
+				stage TEXT NOT NULL DEFAULT 'queued',
+				audio_path TEXT,
+				pcm_path TEXT,
+				transcript TEXT,
+				clip_start REAL,
+				clip_end REAL,
+				quality TEXT,
+				stt_tier TEXT,
+				created REAL NOT NULL,
+				updated REAL NOT NULL
+			);
+			CREATE TABLE IF NOT EXISTS segments (
+				job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+				idx INTEGER NOT NULL,
+				text TEXT NOT NULL,
+				PRIMARY KEY (job_id, idx)
+			);
+		""")
+		# Stores created before these columns existed
+		columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+		for column, kind in (("clip_start", "REAL"), ("clip_end", "REAL"), ("quality", "TEXT"), ("stt_tier", "TEXT")):
+			if column not in columns:
+				self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+	def add(self, record: dict, leader_id: int | None = None) -> int:
+		now = time.time()
+		cursor = self.conn.execute(
+			"INSERT INTO jobs (leader_id, source_id, media_id, canonical_url, thumbnail_url, channel_id, user_id, clip_start, clip_end, quality, created, updated) "
+			"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+			(leader_id, record["source_id"], record["media_id"], record["canonical_url"], record["thumbnail_url"],
+			 record["channel_id"], record["user_id"], record.get("clip_start"), record.get("clip_end"), record.get("quality"), now, now)
+		)
+		return cursor.lastrowid
+
+	def update(self, job_id: int, **fields):
+		"""Record progress, eg. update(id, stage="downloaded", audio_path=path)."""
+		if "stage" in fields and fields["stage"] not in STAGES:
+			raise ValueError(f"Unknown stage {fields['stage']}")
+		columns = ", ".join(f"{name} = ?" for name in fields)
+		self.conn.execute(f"UPDATE jobs SET {columns}, updated = ? WHERE id = ?", (*fields.values(), time.time(), job_id))
+
+	def save_segment(self, job_id: int, idx: int, text: str):
+		self.conn.execute("INSERT OR REPLACE INTO segments (job_id, idx, text) VALUES (?, ?, ?)", (job_id, idx, text))
+
+	def segments(self, job_id: int) -> dict[int, str]:
+		rows = self.conn.execute("SELECT idx, text FROM segments WHERE job_id = ?", (job_id,))
+		return {row["idx"]: row["text"] for row in rows}
+
+	def remove(self, job_id: int):
+		"""Forget a job, its followers and its partial transcript."""
+		self.conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+	def unfinished(self) -> list[sqlite3.Row]:
+		return self.conn.execute("SELECT * FROM jobs WHERE leader_id IS NULL ORDER BY id").fetchall()
+
+	def followers(self, leader_id: int) -> list[sqlite3.Row]:
+		return self.conn.execute("SELECT * FROM jobs WHERE leader_id = ? ORDER BY id", (leader_id,)).fetchall()
+
+	def close(self):
+		self.conn.close()
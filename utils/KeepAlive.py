@@ -0,0 +1,150 @@
+import json, math, os, time
+from collections import deque
+from pathlib import Path
+
+class KeepAlivePolicy:
+	"""
+	Decides how long idle STT servers stay up from when requests arrived before.
+	Two estimates of the chance a request arrives within the next `horizon` seconds, the larger wins:
+	- recent inter-arrival gaps, given how long it has been since the last request (bursts)
+	- how often each hour of the day has seen requests, exponentially decayed with half_life_days (daily patterns)
+	Idle servers are kept for max_idle while a request is likely, otherwise shut down after min_idle,
+	and one is pre-started when a request is very likely but nothing is running.
+	Until min_gaps requests have been seen the timeout is default_idle.
+	The history is saved to `path` so the daily pattern survives restarts.
+	"""
+	def __init__(
+		self,
+		path: str,
+		min_idle: float = 60,
+		max_idle: float = 30 * 60,
+		default_idle: float = 5 * 60,
+		horizon: float = 5 * 60,
+		keep_threshold: float = 0.5,
+		prestart_threshold: float = 0.8,
+		history: int = 200,
+		min_gaps: int = 5,
+		half_life_days: float = 14,
+	):
+		self.path = path
+		self.min_idle = min_idle
+		self.max_idle = max_idle
+		self.default_idle = default_idle
+		self.horizon = horizon
+		self.keep_threshold = keep_threshold
+		self.prestart_threshold = prestart_threshold
+		self.min_gaps = min_gaps
+		self.half_life_days = half_life_days
+
+		self.gaps: deque[float] = deque(maxlen=history)
+		self.hourly = [0.0] * 24      # decayed count of days each local hour of day had a request
+		self.observed_days = 0.0      # decayed days of history the counts cover
+		self.last_arrival: float | None = None
+		self.updated: float | None = None
+		self._dirty = False
+		self._load()
+
+	def _load(self):
+		try:
+			with open(self.path, "r", encoding="utf-8") as f:
+				state = json.load(f)
+		except (FileNotFoundError, json.JSONDecodeError):
+			return
+		self.gaps.extend(state.get("gaps", []))
+		self.hourly = state.get("hourly", self.hourly)
+		self.observed_days = state.get("observed_days", 0.0)
+		self.last_arrival = state.get("last_arrival")
+		self.updated = state.get("updated")
+
+	def save(self):
+		if not self._dirty:
+			return
+		Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = self.path + ".tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump({
+				"gaps": list(self.gaps),
+				"hourly": self.hourly,
+				"observed_days": self.observed_days,
+				"last_arrival": self.last_arrival,
+				"updated": self.updated,
+			}, f)
+		os.replace(tmp_path, self.path)
+		self._dirty = False
+
+	def _decayed(self, now: float) -> tuple[list[float], float]:
+		"""The hourly counts and observed days as of `now`, so quiet spells fade the pattern too."""
+		if self.updated is None or now <= self.updated:
+			return self.hourly, self.observed_days
+		factor = 0.5 ** ((now - self.updated) / 86400 / self.half_life_days)
+		# Decayed length of the observed history, so a count can be turned back into a rate
+		observed_days = self.observed_days * factor + self.half_life_days / math.log(2) * (1 - factor)
+		return [count * factor for count in self.hourly], observed_days
+
+	def _decay(self, now: float):
+		if self.updated is None or now > self.updated:
+			self.hourly, self.observed_days = self._decayed(now)
+			self.updated = now
+
+	def observe(self, now: float | None = None):
+		"""Record a request arriving."""
+		now = time.time() if now is None else now
+		self._decay(now)
+		if self.last_arrival is not None and now >= self.last_arrival:
+			self.gaps.append(now - self.last_arrival)
+		if not self._seen_hour(now):
+			self.hourly[time.localtime(now).tm_hour] += 1
+		self.last_arrival = now
+		self._dirty = True
+
+	@staticmethod
+	def _hour_start(at: float) -> float:
+		"""Start of the local hour containing `at`, the counts are per local hour so this has to be too."""
+		local = time.localtime(at)
+		return at - at % 1 - local.tm_min * 60 - local.tm_sec
+
+	def _seen_hour(self, at: float) -> bool:
+		"""Whether the last request fell in the same local hour as `at`."""
+		return self.last_arrival is not None and self._hour_start(self.last_arrival) == self._hour_start(at)
+
+	@staticmethod
+	def _hour_chance(at: float, hourly: list[float], observed_days: float) -> float:
+		"""Chance the local hour containing `at` sees a request, from how many past days it did."""
+		# The day the history started counts as observed too, a day's requests can't be more than one day
+		return min(1.0, hourly[time.localtime(at).tm_hour] / (observed_days + 1))
+
+	def probability(self, now: float | None = None, horizon: float | None = None) -> float:
+		"""Chance that at least one request arrives in the next `horizon` seconds."""
+		now = time.time() if now is None else now
+		horizon = self.horizon if horizon is None else horizon
+
+		# Bursts: of the past gaps longer than the current idle time, how many ended within the horizon
+		burst = 0.0
+		if self.last_arrival is not None and len(self.gaps) >= self.min_gaps:
+			idle = now - self.last_arrival
+			longer = [gap for gap in self.gaps if gap > idle]
+			if longer:
+				burst = sum(1 for gap in longer if gap <= idle + horizon) / len(longer)
+
+		# Time of day: spread each hour's chance over the hour, for the hours the horizon covers.
+		# An hour that has already had its requests is left to the burst estimate, usage comes in sessions
+		hourly, observed_days = self._decayed(now)
+		miss, at, end = 1.0, now, now + horizon
+		while at < end:
+			hour_end = self._hour_start(at) + 3600
+			if not self._seen_hour(at):
+				miss *= (1 - self._hour_chance(at, hourly, observed_days)) ** ((min(end, hour_end) - at) / 3600)
+			at = hour_end
+		return max(burst, 1 - miss)
+
+	def idle_timeout(self, now: float | None = None) -> float:
+		"""How long an idle server should be kept running right now."""
+		if len(self.gaps) < self.min_gaps:
+			return self.default_idle
+		return self.max_idle if self.probability(now) >= self.keep_threshold else self.min_idle
+
+	def should_prestart(self, now: float | None = None) -> bool:
+		"""Whether a request is likely enough to start a server before it arrives."""
+		if len(self.gaps) < self.min_gaps:
+			return False
+		return self.probability(now) >= self.prestart_threshold
@@ -0,0 +1,129 @@
+import asyncio, json, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+	import yt_dlp
+except ImportError:  # optional, sources fall back to running the yt-dlp command
+	yt_dlp = None
+
+BASE_OPTIONS = {
+	"quiet": True,
+	"no_warnings": True,
+	"noprogress": True,
+	"noplaylist": True,
+	# A stalled host fails the call instead of holding one of the few worker processes indefinitely,
+	# cancelling the awaiting coroutine (eg. the probe timeout) doesn't stop the worker
+	"socket_timeout": 15,
+}
+
+# Protocols ffmpeg can read directly from a resolved media URL
+STREAMABLE_PROTOCOLS = {"http", "https", "m3u8", "m3u8_native"}
+
+
+class FetchError(Exception):
+	"""yt-dlp couldn't get the media, the message is yt-dlp's error line."""
+
+
+class FetcherCrashed(Exception):
+	"""A fetcher worker process died, says nothing about the media so it's worth retrying."""
+
+
+# ── Worker process side ──
+# Each worker keeps one YoutubeDL per distinct option set, so extractors stay initialised
+# and HTTP connections are reused between jobs. The format differs per job, so it isn't part of the set.
+_clients: dict[str, "yt_dlp.YoutubeDL"] = {}
+
+def _client(options: dict) -> "yt_dlp.YoutubeDL":
+	options = dict(options)
+	fmt = options.pop("format", None)
+	key = json.dumps(options, sort_keys=True)
+	ydl = _clients.get(key)
+	if ydl is None:
+		ydl = _clients[key] = yt_dlp.YoutubeDL({**BASE_OPTIONS, **options})
+	# Safe to swap per call, a worker only runs one job at a time. YoutubeDL builds its selector once, so set both
+	ydl.params["format"] = fmt
+	ydl.format_selector = ydl.build_format_selector(fmt) if fmt else None
+	return ydl
+
+def _init_worker():
+	# Load the extractor classes now rather than on the first job
+	yt_dlp.extractor.gen_extractor_classes()
+	_client({})
+
+def _run(action: str, url: str, options: dict, output_path: str | None):
+	try:
+		if action == "probe":
+			ydl = _client(options)
+			return ydl.sanitize_info(ydl.extract_info(url, download=False))
+
+		if action == "resolve":
+			info = _client(options).extract_info(url, download=False)
+			formats = info.get("requested_formats") or [info]
+			if len(formats) != 1 or formats[0].get("protocol") not in STREAMABLE_PROTOCOLS:
+				return None
+			return {"url": formats[0]["url"], "http_headers": formats[0].get("http_headers") or {}}
+
+		if action == "download":
+			section = options.pop("section", None)  # [start, end or None], set per call so clients stay shared
+			ydl = _client(options)
+			ydl.params["outtmpl"] = {"default": output_path}
+			ydl.params["download_ranges"] = yt_dlp.utils.download_range_func(None, [(section[0], section[1] or float("inf"))]) if section else None
+			info = ydl.extract_info(url, download=True)
+			downloads = info.get("requested_downloads") or [{}]
+			return downloads[0].get("filepath")
+	except yt_dlp.utils.YoutubeDLError as e:
+		# yt-dlp's exceptions don't always survive pickling, send back the message only
+		raise FetchError(str(e)) from None
+	raise ValueError(f"Unknown fetch action {action}")
+
+
+# ── Bot side ──
+class MediaFetcher:
+	"""
+	Pool of worker processes with yt-dlp's Python API loaded, so jobs don't pay for
+	interpreter startup and extractor initialisation every time.
+	Unavailable (available is False) when the yt_dlp package isn't installed.
+	"""
+	def __init__(self, workers: int = 2):
+		self.workers = workers
+		self._pool: ProcessPoolExecutor | None = None
+
+	@property
+	def available(self) -> bool:
+		return yt_dlp is not None
+
+	def _get_pool(self) -> ProcessPoolExecutor:
+		if self._pool is None:
+			self._pool = ProcessPoolExecutor(
+				max_workers=self.workers,
+				mp_context=multiprocessing.get_context("spawn"),  # forking the bot's event loop and threads isn't safe
+				initializer=_init_worker,
+			)
+		return self._pool
+
+	async def _submit(self, action: str, url: str, options: dict, output_path: str | None = None):
+		loop = asyncio.get_running_loop()
+		try:
+			return await loop.run_in_executor(self._get_pool(), _run, action, url, options, output_path)
+		except BrokenProcessPool:
+			# A worker died (eg. killed), start a fresh pool for the next job
+			self._pool = None
+			raise FetcherCrashed("The media fetcher crashed, please try again.") from None
+
+	async def probe(self, url: str, options: dict) -> dict:
+		"""yt-dlp's info dict for the media, without downloading it."""
+		return await self._submit("probe", url, options)
+
+	async def resolve(self, url: str, options: dict) -> dict | None:
+		"""Direct media URL and headers for the selected format, or None if ffmpeg can't read it directly."""
+		return await self._submit("resolve", url, options)
+
+	async def download(self, url: str, options: dict, output_path: str) -> str:
+		"""Download to the output template and return the final file path."""
+		return await self._submit("download", url, options, output_path)
+
+	def close(self):
+		if self._pool is not None:
+			self._pool.shutdown(wait=False, cancel_futures=True)
+			self._pool = None
@@ -0,0 +1,79 @@
+import os, json, time, math
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+# Upper bounds (seconds) of the latency histogram buckets, the last bucket catches everything above
+BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, math.inf)
+
+class StageTimings:
+	"""Rolling window of recent durations for percentiles, plus an all-time bucketed histogram."""
+	def __init__(self, window: int):
+		self.samples: deque[float] = deque(maxlen=window)
+		self.histogram = [0] * len(BUCKETS)
+		self.count = 0
+		self.total = 0.0
+
+	def observe(self, seconds: float):
+		self.samples.append(seconds)
+		self.count += 1
+		self.total += seconds
+		for i, bound in enumerate(BUCKETS):
+			if seconds <= bound:
+				self.histogram[i] += 1
+				break
+
+	def percentile(self, p: float) -> float | None:
+		if not self.samples:
+			return None
+		ordered = sorted(self.samples)
+		return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+	def summary(self) -> dict:
+		return {
+			"count": self.count,
+			"mean": self.total / self.count if self.count else None,
+			"p50": self.percentile(50),
+			"p95": self.percentile(95),
+			"p99": self.percentile(99),
+			"max": max(self.samples) if self.samples else None,
+			"histogram": {("+Inf" if math.isinf(b) else str(b)): n for b, n in zip(BUCKETS, self.histogram)},
+		}
+
+
+class Metrics:
+	"""Per-stage latency timings and event counters for the transcription pipeline."""
+	def __init__(self, window: int = 500):
+		self.window = window
+		self.stages: dict[str, StageTimings] = defaultdict(lambda: StageTimings(self.window))
+		self.counters: dict[str, int] = defaultdict(int)
+		self.started = time.time()
+
+	def observe(self, stage: str, seconds: float):
+		self.stages[stage].observe(seconds)
+
+	@contextmanager
+	def timer(self, stage: str):
+		"""Time the body and record it under stage, failed attempts are not recorded."""
+		start = time.perf_counter()
+		yield
+		self.observe(stage, time.perf_counter() - start)
+
+	def incr(self, counter: str, n: int = 1):
+		self.counters[counter] += n
+
+	def snapshot(self) -> dict:
+		return {
+			"generated": time.time(),
+			"uptime": time.time() - self.started,
+			"stages": {name: timings.summary() for name, timings in self.stages.items()},
+			"counters": dict(self.counters),
+		}
+
+	def write(self, path: str):
+		"""Atomically dump a JSON snapshot for external scrapers."""
+		Path(path).parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = path + ".tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self.snapshot(), f, indent=2)
+		os.replace(tmp_path, path)
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+class Stage:
+	"""
+	One step of a Pipeline: `concurrency` workers pull items from a queue and run `handler`.
+	A bounded queue applies backpressure to the stage before it.
+	Any object with asyncio.Queue's put/get/task_done can be passed as `queue` (eg. a scheduler).
+	"""
+	def __init__(self, name: str, handler: Callable[[Any], Awaitable[Any]], concurrency: int = 1, queue_size: int = 0, queue=None):
+		self.name = name
+		self.handler = handler
+		self.concurrency = concurrency
+		self.queue: asyncio.Queue = queue if queue is not None else asyncio.Queue(maxsize=queue_size)
+		self.busy = 0
+
+
+class Pipeline:
+	"""
+	Chains stages together so different jobs can be in different stages at the same time.
+	A handler returns the item to pass on to the next stage, or None to drop it.
+	Exceptions are reported to on_error and the item is dropped.
+	"""
+	def __init__(self, stages: list[Stage], on_error: Callable[[Any, Stage, Exception], Awaitable[None]]):
+		self.stages = stages
+		self.on_error = on_error
+		self._tasks: list[asyncio.Task] = []
+
+	def __getitem__(self, name: str) -> Stage:
+		for stage in self.stages:
+			if stage.name == name:
+				return stage
+		raise KeyError(name)
+
+	async def put(self, item, stage: str | None = None):
+		"""Feed an item into the first stage, or into a named stage."""
+		target = self[stage] if stage else self.stages[0]
+		await target.queue.put(item)
+
+	def start(self):
+		for index, stage in enumerate(self.stages):
+			following = self.stages[index + 1] if index + 1 < len(self.stages) else None
+			for n in range(stage.concurrency):
+				task = asyncio.create_task(self._run(stage, following), name=f"pipeline-{stage.name}-{n}")
+				self._tasks.append(task)
+
+	async def stop(self):
+		for task in self._tasks:
+			task.cancel()
+		await asyncio.gather(*self._tasks, return_exceptions=True)
+		self._tasks.clear()
+
+	async def _run(self, stage: Stage, following: Stage | None):
+		while True:
+			item = await stage.queue.get()
+			stage.busy += 1
+			try:
+				result = await stage.handler(item)
+			except asyncio.CancelledError:
+				raise
+			except Exception as e:
+				result = None
+				try:
+					await self.on_error(item, stage, e)
+				except Exception as report_error:
+					print(f"[pipeline] error handler for stage {stage.name} failed: {report_error}")
+			finally:
+				stage.busy -= 1
+				stage.queue.task_done()
+
+			if result is not None and following is not None:
+				await following.queue.put(result)
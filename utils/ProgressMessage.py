@@ -0,0 +1,54 @@
+import asyncio, time
+import discord
+
+class ProgressMessage:
+	"""
+	Keeps a Discord message up to date with the latest progress,
+	batching updates so the message is edited at most once every min_interval seconds.
+	"""
+	def __init__(self, message: discord.Message, min_interval: float = 2.0):
+		self.message = message
+		self.min_interval = min_interval
+		self._latest: dict | None = None
+		self._last_edit = 0.0
+		self._task: asyncio.Task | None = None
+		self._closed = False
+
+	def update(self, **edit_kwargs):
+		"""Queue an edit, only the newest pending edit is applied."""
+		if self._closed:
+			return
+		self._latest = edit_kwargs
+		if self._task is None:
+			self._task = asyncio.create_task(self._flush_later())
+
+	async def _flush_later(self):
+		delay = self._last_edit + self.min_interval - time.monotonic()
+		if delay > 0:
+			await asyncio.sleep(delay)
+		self._task = None
+		await self._edit()
+
+	async def _edit(self):
+		edit_kwargs, self._latest = self._latest, None
+		if edit_kwargs is None:
+			return
+		self._last_edit = time.monotonic()
+		try:
+			await self.message.edit(**edit_kwargs)
+		except discord.HTTPException as e:
+			# Deleted message, missing permissions etc, stop trying
+			print(f"Failed to update progress message: {e}")
+			self.close()
+
+	async def finish(self, **edit_kwargs):
+		"""Apply a final edit immediately and stop accepting updates."""
+		self.close()
+		self._latest = edit_kwargs
+		await self._edit()
+
+	def close(self):
+		self._closed = True
+		if self._task is not None:
+			self._task.cancel()
+			self._task = None
@@ -1,39 +1,89 @@
-import requests, os
+import asyncio, aiohttp, os
 from utils import utils
 
 class STTClient:
-	def __init__(self, host: str, port: int, endpoint: str, config, log_dir: str, debug = False):
+	def __init__(self, host: str, port: int, endpoint: str, config, log_dir: str, debug = False, max_connections: int = 4, timeout: float = 60 * 60):
 		self.endpoint = f"http://{host}:{port}{endpoint}"
-		self.session = requests.Session()
+		self.health_url = f"http://{host}:{port}/health"
+		self.max_connections = max_connections
+		self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=10)
+		# Created lazily, the client may be constructed outside the event loop (eg. in an executor)
+		self.session: aiohttp.ClientSession | None = None
 
 		self.beam_size = config["hyperparameters"]["beam_size"]
 		self.prompt = config["prompt"]
 
 		cmd = [
-			f"{os.getenv('WHISPER_BACKEND')}\\whisper-server", "-m", config["model"],
+			os.path.join(os.getenv("WHISPER_BACKEND"), "whisper-server"), "-m", config["model"],
 			"-vm", config["vad"], "-fa", "--port", str(port)
 		]
 		# TODO does python have destructors?
 		self.process = utils.start_subprocess(cmd, int(debug), log_dir)
 		print(f"STT server running at: {self.endpoint}")
 
+	def _get_session(self) -> aiohttp.ClientSession:
+		if self.session is None or self.session.closed:
+			connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+			self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+		return self.session
+
+	async def wait_until_ready(self, timeout: float = 120, interval: float = 0.25):
+		"""
+		Poll the server until it answers HTTP requests, the model is loaded before it starts listening.
+		A 503 means it is still loading, anything else (including a 404 from servers without /health) means ready.
+		"""
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + timeout
+		probe_timeout = aiohttp.ClientTimeout(total=2)
+		while True:
+			code = self.process.poll()
+			if code is not None:
+				raise RuntimeError(f"STT server exited with code {code} before becoming ready")
+			try:
+				async with self._get_session().get(self.health_url, timeout=probe_timeout) as response:
+					if response.status != 503:
+						return
+			except (aiohttp.ClientError, asyncio.TimeoutError):
+				pass
+			if loop.time() >= deadline:
+				raise TimeoutError(f"STT server at {self.endpoint} not ready after {timeout}s")
+			await asyncio.sleep(interval)
+
 	def close(self):
 		self.process.terminate()
 		self.process.wait()
 		print("STT server terminated")
 
-	def transcribe(self, audio_b64: str) -> str:
-		# Build payload for Whisper server
-		payload = {
-			"audio": audio_b64,
-			"prompt": self.prompt,
-			"suppress_non_speech": False,
-			"temperature": 0.0,
-			"beam_size": self.beam_size,
-			"vad": True
-		}
-		response = self.session.post(self.endpoint, json=payload)
-		response.raise_for_status()
+	async def aclose(self):
+		"""Close the pooled HTTP session, then terminate the server without blocking the loop."""
+		if self.session is not None and not self.session.closed:
+			await self.session.close()
+		await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+	@staticmethod
+	async def _wav_body(pcm: bytes | memoryview | list[memoryview], sample_rate: int, chunk_size: int = 64 * 1024):
+		"""Yield a WAV header followed by zero-copy slices of the PCM, or of several PCM parts played back to back."""
+		parts = [memoryview(part) for part in (pcm if isinstance(pcm, list) else [pcm])]
+		yield utils.wav_header(sum(len(part) for part in parts), sample_rate)
+		for view in parts:
+			for offset in range(0, len(view), chunk_size):
+				yield view[offset:offset + chunk_size]
+
+	async def transcribe(self, pcm: bytes | memoryview | list[memoryview], sample_rate: int = 16000) -> str:
+		# Build a multipart form for Whisper server, the audio is streamed rather than base64'd into JSON
+		form = aiohttp.FormData()
+		form.add_field("file", self._wav_body(pcm, sample_rate), filename="audio.wav", content_type="audio/wav")
+		form.add_field("prompt", self.prompt)
+		form.add_field("suppress_nst", "false")
+		form.add_field("temperature", "0.0")
+		form.add_field("beam_size", str(self.beam_size))
+		form.add_field("vad", "true")
+		form.add_field("response_format", "json")
+
+		# Cancelling the awaiting task aborts the request and releases the pooled connection
+		async with self._get_session().post(self.endpoint, data=form) as response:
+			response.raise_for_status()
+			data = await response.json(content_type=None)
 
 		# Extract and return the transcript
-		return response.json().get("text", "").strip()
\ No newline at end of file
+		return data.get("text", "").strip()
@@ -0,0 +1,172 @@
+import asyncio, math, time
+from utils.STT import STTClient
+from utils import utils
+
+class STTInstance:
+	"""Book-keeping for one whisper-server process in the pool."""
+	def __init__(self, client: STTClient):
+		self.client = client
+		self.in_flight = 0
+		self.last_used = time.perf_counter()
+		self.ready = asyncio.Event()
+		self.warmup: asyncio.Task | None = None
+
+	@property
+	def healthy(self) -> bool:
+		return self.client.process.poll() is None
+
+
+class NoHealthyServer(RuntimeError):
+	"""Every server in the pool has crashed or been shut down, scale() replaces them."""
+
+
+class STTPool:
+	"""
+	Runs between min_instances and max_instances whisper-servers on separate free ports.
+	Requests go to the least-loaded healthy instance, the pool grows with queue depth
+	and each instance is shut down on its own once it has been idle long enough.
+	"""
+	def __init__(
+		self,
+		host: str,
+		endpoint: str,
+		config,
+		log_dir: str,
+		min_instances: int = 0,
+		max_instances: int = 2,
+		jobs_per_instance: int = 2,
+		ready_timeout: float = 120,
+	):
+		self.host = host
+		self.endpoint = endpoint
+		self.config = config
+		self.log_dir = log_dir
+		self.min_instances = min_instances
+		self.max_instances = max_instances
+		self.jobs_per_instance = jobs_per_instance
+		self.ready_timeout = ready_timeout
+
+		self.instances: list[STTInstance] = []
+		self._lock = asyncio.Lock()
+
+	def __len__(self) -> int:
+		return len(self.instances)
+
+	@property
+	def busy(self) -> bool:
+		return any(instance.in_flight for instance in self.instances)
+
+	async def _start_instance(self) -> STTInstance:
+		loop = asyncio.get_running_loop()
+
+		def create_client():
+			port = utils.get_free_port()
+			return STTClient(self.host, port, self.endpoint, self.config, self.log_dir)
+
+		# Run potentially blocking process spawn in a thread pool
+		client = await loop.run_in_executor(None, create_client)
+		instance = STTInstance(client)
+		instance.warmup = asyncio.create_task(self._warm_up(instance))
+		return instance
+
+	async def _warm_up(self, instance: STTInstance):
+		started = time.perf_counter()
+		try:
+			await instance.client.wait_until_ready(self.ready_timeout)
+		except Exception as e:
+			print(f"STT server at {instance.client.endpoint} failed to start: {e}")
+			async with self._lock:
+				if instance in self.instances:
+					self.instances.remove(instance)
+			await instance.client.aclose()
+			return
+		instance.last_used = time.perf_counter()
+		instance.ready.set()
+		print(f"STT server at {instance.client.endpoint} ready after {instance.last_used - started:.1f}s")
+
+	async def scale(self, queue_depth: int, wait: bool = True):
+		"""
+		Make sure enough instances are running for queue_depth outstanding jobs (at least one).
+		With wait=True, returns once at least one instance is ready to serve.
+		"""
+		desired = math.ceil(max(queue_depth, 1) / self.jobs_per_instance)
+		desired = max(self.min_instances, min(self.max_instances, desired))
+
+		async with self._lock:
+			# Drop anything that crashed so it gets replaced
+			for instance in [i for i in self.instances if not i.healthy]:
+				print(f"STT server at {instance.client.endpoint} died, removing from pool")
+				self.instances.remove(instance)
+				await instance.client.aclose()
+
+			missing = desired - len(self.instances)
+			if missing > 0:
+				started = await asyncio.gather(*(self._start_instance() for _ in range(missing)))
+				self.instances.extend(started)
+				print(f"STT pool scaled to {len(self.instances)} instance(s)")
+
+		if wait:
+			await self.wait_ready()
+
+	async def wait_ready(self):
+		"""Wait until any instance is ready, raising if every warming instance fails."""
+		while not any(i.ready.is_set() for i in self.instances):
+			warming = [i.warmup for i in self.instances if i.warmup and not i.warmup.done()]
+			if not warming:
+				raise RuntimeError("No STT server became ready")
+			await asyncio.wait(warming, return_when=asyncio.FIRST_COMPLETED)
+
+	def _pick(self) -> STTInstance:
+		healthy = [i for i in self.instances if i.healthy and i.ready.is_set()]
+		if not healthy:
+			raise NoHealthyServer("No healthy STT server available")
+		return min(healthy, key=lambda i: (i.in_flight, i.last_used))
+
+	async def transcribe(self, pcm: bytes | memoryview | list[memoryview]) -> str:
+		instance = self._pick()
+		instance.in_flight += 1
+		try:
+			return await instance.client.transcribe(pcm)
+		finally:
+			instance.in_flight -= 1
+			instance.last_used = time.perf_counter()
+
+	@property
+	def warm(self) -> bool:
+		return any(i.ready.is_set() and i.healthy for i in self.instances)
+
+	def idle_instances(self) -> list[tuple[float, int | None]]:
+		"""(idle seconds, resident bytes if known) for each ready instance that isn't serving a request."""
+		now = time.perf_counter()
+		return [
+			(now - i.last_used, utils.process_rss(i.client.process.pid))
+			for i in self.instances
+			if i.ready.is_set() and not i.in_flight
+		]
+
+	async def reap_idle(self, idle_timeout: float) -> list[tuple[float, int | None]]:
+		"""
+		Shut down instances (above min_instances) that have been idle for idle_timeout seconds.
+		Returns (idle seconds, resident bytes if known) for each one shut down.
+		"""
+		now = time.perf_counter()
+		reaped = []
+		async with self._lock:
+			for instance in list(self.instances):
+				if len(self.instances) <= self.min_instances:
+					break
+				if not instance.ready.is_set() or instance.in_flight or now - instance.last_used < idle_timeout:
+					continue
+				print(f"Shutting down STT server at {instance.client.endpoint} due to inactivity...")
+				reaped.append((now - instance.last_used, utils.process_rss(instance.client.process.pid)))
+				self.instances.remove(instance)
+				await instance.client.aclose()
+		return reaped
+
+	async def close(self):
+		async with self._lock:
+			instances, self.instances = self.instances, []
+		for instance in instances:
+			if instance.warmup:
+				instance.warmup.cancel()
+		await asyncio.gather(*(instance.client.aclose() for instance in instances))
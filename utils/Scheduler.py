@@ -0,0 +1,140 @@
+import asyncio, heapq, itertools
+from typing import Any, Callable, Hashable
+
+class _UserQueue:
+	def __init__(self):
+		self.heap: list[tuple] = []
+		self.vtime = 0.0  # expected work already handed out to this user
+		self.live = 0
+
+class FairScheduler:
+	"""
+	Queue that shares workers fairly between users instead of strict FIFO.
+	Each user has their own queue, the next job comes from the user who has been served
+	the least expected work so far (start-time fair queuing). Within a user's queue jobs are
+	FIFO, or shortest-expected-first when shortest_first is set.
+	Enqueue/dequeue are O(log n), cancel is O(1) (lazy removal).
+
+	Exposes the asyncio.Queue methods the Pipeline uses (put, get, task_done, qsize).
+	"""
+	def __init__(
+		self,
+		user_of: Callable[[Any], Hashable],
+		cost_of: Callable[[Any], float | None],
+		shortest_first: bool = False,
+		default_cost: float = 300,
+	):
+		self.user_of = user_of
+		self.cost_of = cost_of
+		self.shortest_first = shortest_first
+		self.default_cost = default_cost
+
+		self._users: dict[Hashable, _UserQueue] = {}
+		self._ready: list[tuple[float, int, Hashable]] = []  # (vtime, seq, user), stale entries skipped
+		self._entries: dict[int, list] = {}                  # id(item) → heap entry, for cancel
+		self._seq = itertools.count()
+		self._clock = 0.0
+		self._available = asyncio.Semaphore(0)
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, item) -> bool:
+		return id(item) in self._entries
+
+	def __iter__(self):
+		"""Queued items in no particular order."""
+		return (entry[2] for entry in self._entries.values())
+
+	def qsize(self) -> int:
+		return len(self._entries)
+
+	def _cost(self, item) -> float:
+		cost = self.cost_of(item)
+		return self.default_cost if cost is None else cost
+
+	def put_nowait(self, item):
+		user = self.user_of(item)
+		queue = self._users.get(user)
+		if queue is None:
+			queue = self._users[user] = _UserQueue()
+		if queue.live == 0:
+			# A user coming back doesn't get to bank credit from while they were away
+			queue.vtime = max(queue.vtime, self._clock)
+			heapq.heappush(self._ready, (queue.vtime, next(self._seq), user))
+
+		seq = next(self._seq)
+		key = self._cost(item) if self.shortest_first else seq
+		entry = [key, seq, item, True]  # last field: still live
+		heapq.heappush(queue.heap, entry)
+		queue.live += 1
+		self._entries[id(item)] = entry
+		self._available.release()
+
+	async def put(self, item):
+		self.put_nowait(item)
+
+	def cancel(self, item) -> bool:
+		"""Remove a queued item, returns False if it isn't queued (eg. already started)."""
+		entry = self._entries.pop(id(item), None)
+		if entry is None:
+			return False
+		entry[3] = False
+		self._users[self.user_of(item)].live -= 1
+		return True
+
+	def _pop(self):
+		while self._ready:
+			vtime, _, user = heapq.heappop(self._ready)
+			queue = self._users[user]
+			if queue.live == 0 or vtime != queue.vtime:
+				continue  # stale
+			while queue.heap:
+				entry = heapq.heappop(queue.heap)
+				if entry[3]:
+					break
+			else:
+				continue
+
+			item = entry[2]
+			del self._entries[id(item)]
+			queue.live -= 1
+			self._clock = queue.vtime
+			queue.vtime += self._cost(item)
+			if queue.live:
+				heapq.heappush(self._ready, (queue.vtime, next(self._seq), user))
+			else:
+				queue.heap.clear()
+			return item
+		return None
+
+	async def get(self):
+		while True:
+			await self._available.acquire()
+			item = self._pop()
+			if item is not None:
+				return item
+			# The permit belonged to a cancelled item, wait for the next one
+
+	def task_done(self):
+		pass
+
+	def peek(self, limit: int) -> list:
+		"""The next `limit` items in dispatch order, without removing them."""
+		heads = {}
+		for user, queue in self._users.items():
+			if queue.live:
+				heads[user] = [e[2] for e in heapq.nsmallest(limit + len(queue.heap) - queue.live, queue.heap) if e[3]][:limit]
+
+		order = []
+		ready = [(self._users[user].vtime, i, user) for i, user in enumerate(heads)]
+		heapq.heapify(ready)
+		positions = dict.fromkeys(heads, 0)
+		while ready and len(order) < limit:
+			vtime, i, user = heapq.heappop(ready)
+			item = heads[user][positions[user]]
+			order.append(item)
+			positions[user] += 1
+			if positions[user] < len(heads[user]):
+				heapq.heappush(ready, (vtime + self._cost(item), i, user))
+		return order
@@ -0,0 +1,27 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+class TTLCache:
+	"""Small in-memory cache whose entries expire after a TTL, oldest entries dropped past max_entries."""
+	def __init__(self, ttl: float, max_entries: int = 1024):
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+	def get(self, key: Hashable) -> Any | None:
+		entry = self._entries.get(key)
+		if entry is None:
+			return None
+		expires, value = entry
+		if time.monotonic() >= expires:
+			del self._entries[key]
+			return None
+		self._entries.move_to_end(key)
+		return value
+
+	def put(self, key: Hashable, value: Any, ttl: float | None = None):
+		self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+		self._entries.move_to_end(key)
+		while len(self._entries) > self.max_entries:
+			self._entries.popitem(last=False)
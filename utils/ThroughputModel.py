@@ -0,0 +1,43 @@
+from typing import Iterable
+
+class ThroughputModel:
+	"""
+	Learns how fast the pipeline is from completed jobs (exponentially weighted averages)
+	and turns that into wait time estimates.
+	Rates are in media seconds, so a real-time factor of 0.1 means 10 minutes of audio takes 1 minute of STT.
+	"""
+	def __init__(self, alpha: float = 0.2, stt_rtf: float = 0.3, download_speed: float = 30, default_duration: float = 300):
+		self.alpha = alpha
+		self.stt_rtf = stt_rtf                  # STT wall seconds per media second
+		self.download_speed = download_speed    # media seconds fetched per wall second
+		self.default_duration = default_duration
+		self.samples = 0
+
+	def _ewma(self, old: float, new: float) -> float:
+		return (1 - self.alpha) * old + self.alpha * new
+
+	def observe_stt(self, media_seconds: float, wall_seconds: float):
+		if media_seconds <= 0:
+			return
+		self.stt_rtf = self._ewma(self.stt_rtf, wall_seconds / media_seconds)
+		self.samples += 1
+
+	def observe_download(self, media_seconds: float, wall_seconds: float):
+		if media_seconds <= 0 or wall_seconds <= 0:
+			return
+		self.download_speed = self._ewma(self.download_speed, media_seconds / wall_seconds)
+
+	def stt_seconds(self, duration: float | None) -> float:
+		return (duration or self.default_duration) * self.stt_rtf
+
+	def download_seconds(self, duration: float | None) -> float:
+		return (duration or self.default_duration) / self.download_speed
+
+	def backlog_seconds(self, durations: Iterable[float | None], parallelism: int) -> float:
+		"""STT wall time needed to clear the given jobs with `parallelism` servers."""
+		return sum(self.stt_seconds(d) for d in durations) / max(1, parallelism)
+
+	def estimate(self, backlog: float, duration: float | None) -> tuple[float, float]:
+		"""(seconds until a new job reaches STT, seconds until it finishes), given the current backlog."""
+		start = max(backlog, self.download_seconds(duration))
+		return start, start + self.stt_seconds(duration)
@@ -0,0 +1,116 @@
+import os, json, time, hashlib, threading
+from pathlib import Path
+
+class TranscriptCache:
+	"""
+	On-disk transcript cache addressed by a hash of everything that affects the output
+	(source id, media id, model, prompt and beam size).
+	Entries are evicted least-recently-used first once the cache exceeds its size budget,
+	and unconditionally once they are older than max_age seconds.
+	"""
+	def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, max_age: float | None = 30 * 24 * 60 * 60):
+		self.cache_dir = cache_dir
+		self.max_bytes = max_bytes
+		self.max_age = max_age
+		self._index_path = os.path.join(cache_dir, "index.json")
+		self._lock = threading.Lock()
+
+		Path(cache_dir).mkdir(parents=True, exist_ok=True)
+		self._index: dict[str, dict] = self._load_index()
+
+	@staticmethod
+	def make_key(source_id: str, media_id: str, model: str, prompt: str, beam_size: int) -> str:
+		raw = json.dumps({
+			"source": source_id,
+			"media_id": media_id,
+			"model": model,
+			"prompt": prompt,
+			"beam_size": beam_size,
+		}, sort_keys=True)
+		return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+	def _load_index(self) -> dict[str, dict]:
+		try:
+			with open(self._index_path, "r", encoding="utf-8") as f:
+				index = json.load(f)
+		except (FileNotFoundError, json.JSONDecodeError):
+			return {}
+		# Drop entries whose transcript file has gone missing
+		return {k: v for k, v in index.items() if os.path.exists(self.path_for(k))}
+
+	def _save_index(self):
+		tmp_path = self._index_path + ".tmp"
+		with open(tmp_path, "w", encoding="utf-8") as f:
+			json.dump(self._index, f)
+		os.replace(tmp_path, self._index_path)
+
+	def path_for(self, key: str) -> str:
+		return os.path.join(self.cache_dir, f"{key}.txt")
+
+	def _expired(self, entry: dict, now: float) -> bool:
+		return self.max_age is not None and now - entry["created"] > self.max_age
+
+	def get(self, key: str) -> str | None:
+		"""Return the cached transcript for key, or None on a miss."""
+		with self._lock:
+			entry = self._index.get(key)
+			if entry is None:
+				return None
+
+			now = time.time()
+			if self._expired(entry, now):
+				self._remove(key)
+				self._save_index()
+				return None
+
+			try:
+				with open(self.path_for(key), "r", encoding="utf-8") as f:
+					transcript = f.read()
+			except FileNotFoundError:
+				self._index.pop(key, None)
+				self._save_index()
+				return None
+
+			entry["last_access"] = now
+			self._save_index()
+			return transcript
+
+	def put(self, key: str, transcript: str, metadata: dict) -> str:
+		"""Store a transcript and return the path of the cached file."""
+		with self._lock:
+			path = self.path_for(key)
+			tmp_path = path + ".tmp"
+			with open(tmp_path, "w", encoding="utf-8") as f:
+				f.write(transcript)
+			os.replace(tmp_path, path)
+
+			now = time.time()
+			self._index[key] = {
+				**metadata,
+				"size": os.path.getsize(path),
+				"created": now,
+				"last_access": now,
+			}
+			self._evict(now)
+			self._save_index()
+			return path
+
+	def _remove(self, key: str):
+		self._index.pop(key, None)
+		try:
+			os.remove(self.path_for(key))
+		except FileNotFoundError:
+			pass
+
+	def _evict(self, now: float):
+		for key in [k for k, v in self._index.items() if self._expired(v, now)]:
+			self._remove(key)
+
+		total = sum(entry["size"] for entry in self._index.values())
+		if total <= self.max_bytes:
+			return
+		for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["last_access"]):
+			if total <= self.max_bytes:
+				break
+			total -= entry["size"]
+			self._remove(key)
@@ -1,4 +1,4 @@
-import os, subprocess, threading, socket
+import os, re, sys, shutil, subprocess, threading, socket, struct
 from datetime import datetime
 from pathlib import Path
 
@@ -17,6 +17,40 @@ def get_free_port():
 			return p
 	raise RuntimeError("Unable to allocate port")
 
+def ytdlp_command() -> list[str]:
+	"""How to run yt-dlp here: yt-dlp.exe next to the bot (Windows), the one on PATH, or the Python module."""
+	local = os.path.join(os.getcwd(), "yt-dlp.exe")
+	if os.path.exists(local):
+		return [local]
+	installed = shutil.which("yt-dlp")
+	if installed:
+		return [installed]
+	return [sys.executable, "-m", "yt_dlp"]
+
+TIMESTAMP_REGEX = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+(?:\.\d+)?)s?)?$")
+
+def parse_timestamp(value: str) -> float | None:
+	"""Seconds from "90", "90s", "1m30s", "1h2m3s" or "1:02:03", None if it isn't a timestamp."""
+	value = value.strip().lower()
+	if ":" in value:
+		seconds = 0.0
+		try:
+			for part in value.split(":"):
+				seconds = seconds * 60 + float(part)
+		except ValueError:
+			return None
+		return seconds
+	match = TIMESTAMP_REGEX.match(value)
+	if not value or not match:
+		return None
+	hours, minutes, seconds = match.groups()
+	return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+
+def format_timestamp(seconds: float) -> str:
+	minutes, secs = divmod(int(seconds), 60)
+	hours, minutes = divmod(minutes, 60)
+	return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
 IGNORED_CODES = {0, -15, 1, 3221225786}
 
 def _timestamp() -> str:
@@ -70,3 +104,22 @@ def start_subprocess(cmd, debug_mode: bool = False, log_dir: str = "."):
 			f.write(repr(e))
 		print(f"[subprocess] subprocess by the name {_program} crashed with code (failed to start)")
 		raise
+
+
+def wav_header(data_size: int, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2) -> bytes:
+	"""Canonical 44 byte WAV header for data_size bytes of raw little-endian PCM."""
+	byte_rate = sample_rate * channels * sample_width
+	return struct.pack(
+		"<4sI4s4sIHHIIHH4sI",
+		b"RIFF", 36 + data_size, b"WAVE",
+		b"fmt ", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8,
+		b"data", data_size
+	)
+
+def process_rss(pid: int) -> int | None:
+	"""Resident memory of a process in bytes, None where /proc isn't available (eg. Windows)."""
+	try:
+		with open(f"/proc/{pid}/statm", "r") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except (OSError, ValueError, IndexError, AttributeError):
+		return None
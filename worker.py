@@ -0,0 +1,56 @@
+"""
+Standalone transcription worker for split deployments.
+
+The bot (started with WINSTON_MODE=bot) probes links and queues jobs in the broker, workers lease them,
+run download → convert → transcribe and report the transcript back for the bot to deliver.
+Start as many as the machine has cores/GPUs for. They share the broker file (WINSTON_BROKER,
+default ./data/broker.sqlite3). It's SQLite in WAL mode, whose shared-memory index doesn't work over
+a network filesystem, so only one host is supported: the bot and all its workers run on the same machine.
+
+Everything else is per worker: give each worker on a host its own --slot, it picks the downloads
+directory (./downloads-worker-<slot>, with its own disk budget), keep-alive history and metrics file.
+
+	python worker.py --slot 0 --capacity 4
+	python worker.py --slot 1 --capacity 4
+"""
+import argparse, asyncio, os, signal
+import discord
+from discord.ext import commands
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from cogs.Winston import WinstonCog
+
+async def run(slot: int, capacity: int):
+	bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())  # never logs in, only hosts the cog
+	cog = WinstonCog(bot, mode="worker", worker_slot=slot, worker_capacity=capacity)
+	host = cog.worker_id.split(":", 1)[0]
+	if any(w["id"].startswith(f"{host}:") and w["id"].endswith(f":{slot}") for w in cog.broker.live_workers()):
+		print(f"Another worker on {host} is already using slot {slot}, pick a different --slot")
+		await cog.cog_unload()
+		return
+
+	stop = asyncio.Event()
+	loop = asyncio.get_running_loop()
+	for sig in (signal.SIGINT, signal.SIGTERM):
+		try:
+			loop.add_signal_handler(sig, stop.set)
+		except NotImplementedError:
+			pass  # Windows, Ctrl+C cancels run() instead
+
+	print(f"Worker {cog.worker_id} waiting for jobs (capacity {capacity})")
+	try:
+		await stop.wait()
+	finally:
+		await cog.cog_unload()
+
+def main():
+	parser = argparse.ArgumentParser(description="Winston transcription worker")
+	parser.add_argument("--slot", type=int, default=int(os.getenv("WINSTON_WORKER_SLOT", 0)), help="unique per worker on this host")
+	parser.add_argument("--capacity", type=int, default=int(os.getenv("WINSTON_WORKER_CAPACITY", 4)), help="jobs to run at once")
+	args = parser.parse_args()
+	asyncio.run(run(args.slot, args.capacity))
+
+if __name__ == "__main__":
+	main()